@@ -1,67 +1,225 @@
+import re
+import tempfile
 from django.contrib import admin
+from django.db.models import Count, Max, Min
+from django.http import FileResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import urlencode
+from . import audit, booking_states, exports
+from .paginators import EstimatedCountPaginator
 from .models import (
     AppUser,
     ServiceProvider,
+    Category,
     ServiceProviderCategory,
     Booking,
     CompanyInfo,
+    AllowedEmailDomain,
     PasswordReset,
+    OutboundEmail,
     AuditLog,
+    AuditLogArchive,
 )
 from .forms import (
     AppUserForm,
     ServiceProviderForm,
+    CategoryForm,
     ServiceProviderCategoryForm,
     BookingForm,
     CompanyInfoForm,
+    AllowedEmailDomainForm,
     PasswordResetForm,
+    OutboundEmailForm,
     AuditLogForm,
 )
 
+BOOKING_REF_PREFIX = re.compile(r'GS\d{4}(-\d{0,6})?')
+
+def _label(obj) -> str:
+    return f'{obj._meta.model_name} #{obj.pk} ({obj})'
+
+class AuditedAdmin(admin.ModelAdmin):
+    # every add, change and delete made through the admin is queued for the AuditLog
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change:
+            audit.record_admin(request, f'changed {_label(obj)}: {", ".join(form.changed_data) or "nothing"}')
+        else:
+            audit.record_admin(request, f'added {_label(obj)}')
+
+    def delete_model(self, request, obj):
+        label = _label(obj)
+        super().delete_model(request, obj)
+        audit.record_admin(request, f'deleted {label}')
+
+    def delete_queryset(self, request, queryset):
+        # one entry for the whole selection: a label per row has no bound on the large changelists
+        deleted = queryset.aggregate(count=Count('pk'), first=Min('pk'), last=Max('pk'))
+        super().delete_queryset(request, queryset)
+        if deleted['count']:
+            audit.record_admin(
+                request,
+                f'deleted {deleted["count"]} {queryset.model._meta.model_name} rows with ids {deleted["first"]} to {deleted["last"]}',
+            )
+
+class LargeTableAdmin(AuditedAdmin):
+    # no exact COUNT(*) of the whole table on every changelist page
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def changelist_view(self, request, extra_context=None):
+        # the date hierarchy's all-years view runs a DISTINCT over every row, so start on the current month
+        if self.date_hierarchy and request.method == 'GET' and not request.GET:
+            today = timezone.localdate()
+            query = {f'{self.date_hierarchy}__year': today.year, f'{self.date_hierarchy}__month': today.month}
+            return HttpResponseRedirect(f'{request.path}?{urlencode(query)}')
+        return super().changelist_view(request, extra_context)
+
 @admin.register(AppUser)
-class AppUserAdmin(admin.ModelAdmin):
+class AppUserAdmin(AuditedAdmin):
     form = AppUserForm
     list_display = ('name', 'email', 'phone', 'role')
     search_fields = ('name', 'email', 'phone')
     list_filter = ('role',)
 
 @admin.register(ServiceProvider)
-class ServiceProviderAdmin(admin.ModelAdmin):
+class ServiceProviderAdmin(AuditedAdmin):
     form = ServiceProviderForm
     list_display = ('name', 'phone', 'location', 'role')
     search_fields = ('name', 'phone', 'location')
     list_filter = ('role',)
 
+@admin.register(Category)
+class CategoryAdmin(AuditedAdmin):
+    form = CategoryForm
+    list_display = ('name', 'slug')
+    search_fields = ('name', 'slug')
+    prepopulated_fields = {'slug': ('name',)}
+    def get_readonly_fields(self, request, obj=None):
+        # provider rows, stats and the search index key off the existing name
+        return ('name', 'slug') if obj else ()
+    def get_prepopulated_fields(self, request, obj=None):
+        return {} if obj else self.prepopulated_fields
+
 @admin.register(ServiceProviderCategory)
-class ServiceProviderCategoryAdmin(admin.ModelAdmin):
+class ServiceProviderCategoryAdmin(AuditedAdmin):
     form = ServiceProviderCategoryForm
     list_display = ('provider', 'category_name', 'rent_value', 'other_charges')
     search_fields = ('category_name', 'provider__name')
-    list_filter = ('category_name',)
+    list_filter = ('category',)
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(LargeTableAdmin):
     form = BookingForm
     list_display = ('booking_reference_id', 'user', 'service_provider', 'service_name', 'booking_datetime', 'status', 'final_amount')
+    list_select_related = ('user', 'service_provider')
     search_fields = ('booking_reference_id', 'service_name', 'user__email', 'service_provider__name')
-    list_filter = ('status', 'booking_datetime')
+    list_filter = ('status', 'category', 'booking_datetime')
+    date_hierarchy = 'booking_datetime'
+    ordering = ('-booking_datetime',)
+    autocomplete_fields = ('user', 'service_provider')
+    actions = ('mark_assigned', 'mark_completed', 'mark_cancelled', 'export_csv', 'export_xlsx', 'export_pdf')
+
+    def get_readonly_fields(self, request, obj=None):
+        # an existing booking only changes status through the actions below, which follow TRANSITIONS
+        return ('status',) if obj else ()
+
+    @admin.action(description='Mark selected pending bookings as assigned')
+    def mark_assigned(self, request, queryset):
+        self._transition(request, queryset, 'assign')
+
+    @admin.action(description='Mark selected bookings as completed')
+    def mark_completed(self, request, queryset):
+        self._transition(request, queryset, 'complete')
+
+    @admin.action(description='Cancel selected bookings')
+    def mark_cancelled(self, request, queryset):
+        self._transition(request, queryset, 'cancel')
+
+    def _transition(self, request, queryset, name):
+        declared = booking_states.TRANSITIONS[name]
+        moved = booking_states.transition(queryset, name, actor=request.user.get_username())
+        self.message_user(request, f'{len(moved)} bookings are now {declared.target}; only {" or ".join(declared.sources)} bookings are changed.')
+
+    @admin.action(description='Export selected bookings to CSV')
+    def export_csv(self, request, queryset):
+        response = StreamingHttpResponse(exports.csv_chunks(exports.booking_rows(queryset)), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="bookings.csv"'
+        return response
+
+    @admin.action(description='Export selected bookings to Excel')
+    def export_xlsx(self, request, queryset):
+        return self._export_file(exports.write_xlsx, queryset, 'bookings.xlsx')
+
+    @admin.action(description='Export selected bookings to PDF')
+    def export_pdf(self, request, queryset):
+        return self._export_file(exports.write_pdf, queryset, 'bookings.pdf')
+
+    def _export_file(self, writer, queryset, filename):
+        # zip and PDF files are finished at the end, so build on disk and stream the file back
+        target = tempfile.TemporaryFile()
+        writer(exports.booking_rows(queryset), target)
+        target.seek(0)
+        return FileResponse(target, as_attachment=True, filename=filename)
+
+    def get_search_results(self, request, queryset, search_term):
+        # a reference (or its start) is matched as a case-sensitive prefix, which the unique index on
+        # booking_reference_id can serve; the default icontains over four columns always scans
+        term = search_term.strip().upper()
+        if BOOKING_REF_PREFIX.fullmatch(term):
+            return queryset.filter(booking_reference_id__startswith=term), False
+        return super().get_search_results(request, queryset, search_term)
 
 @admin.register(CompanyInfo)
-class CompanyInfoAdmin(admin.ModelAdmin):
+class CompanyInfoAdmin(AuditedAdmin):
     form = CompanyInfoForm
     list_display = ('company_name', 'owner', 'email', 'mobile')
     search_fields = ('company_name', 'owner', 'email', 'mobile')
 
+@admin.register(AllowedEmailDomain)
+class AllowedEmailDomainAdmin(AuditedAdmin):
+    form = AllowedEmailDomainForm
+    list_display = ('domain', 'is_active')
+    search_fields = ('domain',)
+    list_filter = ('is_active',)
+
 @admin.register(PasswordReset)
-class PasswordResetAdmin(admin.ModelAdmin):
+class PasswordResetAdmin(AuditedAdmin):
     form = PasswordResetForm
-    list_display = ('token', 'user', 'service_provider', 'expiry')
-    search_fields = ('token', 'user__email', 'service_provider__name')
+    list_display = ('token_hash', 'user', 'service_provider', 'expiry')
+    # both foreign keys are nullable, which Django's implicit changelist join skips
+    list_select_related = ('user', 'service_provider')
+    search_fields = ('token_hash', 'user__email', 'service_provider__name')
     list_filter = ('expiry',)
 
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(AuditedAdmin):
+    form = OutboundEmailForm
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    search_fields = ('subject', 'to')
+    list_filter = ('status',)
+
 @admin.register(AuditLog)
-class AuditLogAdmin(admin.ModelAdmin):
+class AuditLogAdmin(LargeTableAdmin):
     form = AuditLogForm
-    list_display = ('admin', 'timestamp', 'action')
-    search_fields = ('admin__email', 'action')
+    list_display = ('actor', 'admin', 'timestamp', 'action')
+    list_select_related = ('admin',)
+    search_fields = ('actor', 'action')
     list_filter = ('timestamp',)
+    date_hierarchy = 'timestamp'
+    ordering = ('-timestamp',)
+    autocomplete_fields = ('admin',)
+
+@admin.register(AuditLogArchive)
+class AuditLogArchiveAdmin(LargeTableAdmin):
+    list_display = ('actor', 'admin', 'timestamp', 'action')
+    list_select_related = ('admin',)
+    search_fields = ('actor', 'action')
+    date_hierarchy = 'timestamp'
+    ordering = ('-timestamp',)
+    def has_add_permission(self, request):
+        return False
+    def has_change_permission(self, request, obj=None):
+        return False
+    def has_delete_permission(self, request, obj=None):
+        return False
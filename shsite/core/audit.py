@@ -0,0 +1,80 @@
+import atexit
+import logging
+import os
+import threading
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.utils import timezone
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+# entries wait here and are written by a timer thread, with one bulk_create, AUDIT_FLUSH_SECONDS after the
+# first is queued or as soon as AUDIT_BUFFER_SIZE are waiting; the request that queued them never waits for the write
+_lock = threading.Lock()
+_write_lock = threading.Lock()
+_buffer = []
+_timer = None
+_pid = os.getpid()
+
+def record(actor: str, action: str, app_user_id: int | None = None):
+    """Queue an audit entry; inside a transaction it is only queued once the transaction commits."""
+    entry = AuditLog(admin_id=app_user_id, actor=actor, action=action, timestamp=timezone.now())
+    transaction.on_commit(lambda: _append(entry))
+
+def record_admin(request, action: str):
+    record(request.user.get_username(), action)
+
+def _append(entry: AuditLog):
+    global _pid, _timer
+    with _lock:
+        if _pid != os.getpid():
+            # forked worker: the parent writes its own entries
+            _buffer.clear()
+            _timer = None
+            _pid = os.getpid()
+        _buffer.append(entry)
+        if len(_buffer) >= settings.AUDIT_BUFFER_SIZE and (_timer is None or _timer.interval):
+            _schedule(0)
+        elif _timer is None:
+            _schedule(settings.AUDIT_FLUSH_SECONDS)
+
+def _schedule(delay: float):
+    global _timer
+    if _timer is not None:
+        _timer.cancel()
+    _timer = threading.Timer(delay, _flush_in_thread)
+    _timer.daemon = True
+    _timer.start()
+
+def _flush_in_thread():
+    try:
+        flush()
+    finally:
+        # the timer thread opened its own connection
+        connections.close_all()
+
+def flush() -> int:
+    global _timer
+    # one write at a time, so the flush at exit waits for a timer thread that is still writing
+    with _write_lock:
+        with _lock:
+            if _timer is not None:
+                _timer.cancel()
+                _timer = None
+            batch = _buffer[:]
+            _buffer.clear()
+        if not batch:
+            return 0
+        try:
+            AuditLog.objects.bulk_create(batch, batch_size=500)
+        except DatabaseError:
+            logger.exception('audit log flush failed')
+            # keep the entries recoverable from the logs
+            for entry in batch:
+                logger.error('unsaved audit entry: %s %s %s', entry.timestamp.isoformat(), entry.actor, entry.action)
+            return 0
+    return len(batch)
+
+# gunicorn workers and management commands exit through the interpreter, so nothing queued is left behind
+atexit.register(flush)
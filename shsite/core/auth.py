@@ -0,0 +1,36 @@
+from django.contrib.auth.hashers import check_password, is_password_usable, make_password
+from .models import AppUser
+
+def _save_rehashed(user: AppUser):
+    def setter(raw_password):
+        user.password = make_password(raw_password)
+        AppUser.objects.filter(pk=user.pk).update(password=user.password)
+    return setter
+
+def authenticate(email: str, password: str) -> AppUser | None:
+    if not email or not password:
+        return None
+    user = AppUser.objects.filter(email=email).first()
+    if user is None or not is_password_usable(user.password):
+        # hash anyway, like Django's ModelBackend, so the response time does not tell which emails have accounts
+        make_password(password)
+        return None
+    # hashes made by an older entry in PASSWORD_HASHERS are upgraded on successful login
+    if check_password(password, user.password, setter=_save_rehashed(user)):
+        return user
+    return None
+
+def email_taken(email: str) -> bool:
+    return AppUser.objects.filter(email=email).exists()
+
+def set_password(user: AppUser, raw_password: str):
+    user.password = make_password(raw_password)
+    user.save(update_fields=['password'])
+
+def change_password(user: AppUser, old_password: str, new_password: str) -> str | None:
+    if old_password == new_password:
+        return 'New password must be different from current.'
+    if not check_password(old_password, user.password):
+        return 'Current password is incorrect.'
+    set_password(user, new_password)
+    return None
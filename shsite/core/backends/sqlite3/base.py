@@ -0,0 +1,31 @@
+"""
+SQLite backend that understands the ``init_command`` and ``transaction_mode``
+OPTIONS added to Django's own backend in 5.1. Point ENGINE back at
+django.db.backends.sqlite3 after upgrading.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = {'DEFERRED', 'EXCLUSIVE', 'IMMEDIATE'}
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        transaction_mode = kwargs.pop('transaction_mode', None)
+        if transaction_mode is not None and transaction_mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f"transaction_mode must be one of {', '.join(sorted(TRANSACTION_MODES))}, not {transaction_mode!r}")
+        self.transaction_mode = transaction_mode.upper() if transaction_mode else None
+        self.init_commands = kwargs.pop('init_command', '').split(';')
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for command in self.init_commands:
+            if command := command.strip():
+                conn.execute(command)
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        # IMMEDIATE takes the write lock at BEGIN; a deferred transaction that reads
+        # before writing fails with "database is locked" instead of waiting
+        self.cursor().execute(f'BEGIN {self.transaction_mode}' if self.transaction_mode else 'BEGIN')
@@ -0,0 +1,18 @@
+"""
+Django template backend that adds the time spent rendering each page to the
+request metrics collected by InstrumentationMiddleware.
+"""
+from django.template.backends import django
+from core.instrumentation import template_timer
+
+class Template(django.Template):
+    def render(self, context=None, request=None):
+        with template_timer():
+            return super().render(context, request)
+
+class DjangoTemplates(django.DjangoTemplates):
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        return Template(super().get_template(template_name).template, self)
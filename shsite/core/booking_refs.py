@@ -0,0 +1,57 @@
+import os
+import threading
+from functools import partial
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import BookingSequence
+
+_lock = threading.Lock()
+_blocks = {}
+_pid = os.getpid()
+
+def _reserve_block(year: int, size: int):
+    with transaction.atomic():
+        if not BookingSequence.objects.filter(year=year).update(last_value=F('last_value') + size):
+            try:
+                with transaction.atomic():
+                    BookingSequence.objects.create(year=year, last_value=size)
+                return 1, size
+            except IntegrityError:
+                BookingSequence.objects.filter(year=year).update(last_value=F('last_value') + size)
+        last = BookingSequence.objects.filter(year=year).values_list('last_value', flat=True).get()
+    return last - size + 1, last
+
+def _keep_block(year: int, first: int, last: int):
+    with _lock:
+        block = _blocks.get(year)
+        if _pid == os.getpid() and first <= last and (not block or block[0] > block[1]):
+            _blocks[year] = [first, last]
+
+def next_booking_number(year: int) -> int:
+    global _pid
+    size = max(1, getattr(settings, 'BOOKING_REF_BLOCK_SIZE', 1))
+    with _lock:
+        if _pid != os.getpid():
+            # forked worker: never reuse numbers reserved by the parent
+            _blocks.clear()
+            _pid = os.getpid()
+        block = _blocks.get(year)
+        if block and block[0] <= block[1]:
+            num = block[0]
+            block[0] += 1
+            return num
+        if not transaction.get_connection().in_atomic_block:
+            first, last = _reserve_block(year, size)
+            _blocks[year] = [first + 1, last]
+            return first
+    # inside the caller's transaction (the admin's changeform) a rollback undoes the counter update, so
+    # another worker can reserve the same numbers: keep the rest of the block only once it commits
+    first, last = _reserve_block(year, size)
+    transaction.on_commit(partial(_keep_block, year, first + 1, last))
+    return first
+
+def generate_booking_ref() -> str:
+    year = timezone.now().year
+    return f'GS{year}-{next_booking_number(year):06d}'
@@ -0,0 +1,69 @@
+from typing import NamedTuple
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.dispatch import Signal
+from .models import Booking
+
+PENDING = 'pending'
+ASSIGNED = 'assigned'
+COMPLETED = 'completed'
+CANCELLED = 'cancelled'
+FINAL_STATES = (COMPLETED, CANCELLED)
+
+class Transition(NamedTuple):
+    sources: tuple
+    target: str
+
+TRANSITIONS = {
+    'assign': Transition((PENDING,), ASSIGNED),
+    'complete': Transition((PENDING, ASSIGNED), COMPLETED),
+    'cancel': Transition((PENDING, ASSIGNED), CANCELLED),
+}
+
+# sent once the change is committed: transition (a TRANSITIONS key, or 'hire' for a new booking), status,
+# bookings as (pk, booking_reference_id) pairs, actor and app_user_id
+booking_transitioned = Signal()
+
+def _notify(transition: str, status: str, bookings: list, actor: str, app_user_id):
+    transaction.on_commit(lambda: booking_transitioned.send(
+        sender=Booking, transition=transition, status=status, bookings=bookings, actor=actor, app_user_id=app_user_id,
+    ))
+
+def _update(queryset, transition: Transition, limit: int) -> list:
+    # one statement: the status is checked by the UPDATE itself, so two requests can never both move a booking
+    connection = connections[router.db_for_write(Booking)]
+    qn = connection.ops.quote_name
+    subquery = queryset.filter(status__in=transition.sources).order_by('pk').values('pk')[:limit]
+    subquery_sql, subquery_params = subquery.query.get_compiler(connection=connection).as_sql()
+    sources = ', '.join(['%s'] * len(transition.sources))
+    sql = (
+        f'UPDATE {qn(Booking._meta.db_table)} SET {qn("status")} = %s '
+        f'WHERE {qn("id")} IN ({subquery_sql}) AND {qn("status")} IN ({sources}) '
+        f'RETURNING {qn("id")}, {qn("booking_reference_id")}'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [transition.target, *subquery_params, *transition.sources])
+        return cursor.fetchall()
+
+def transition(queryset, name: str, actor: str = '', app_user_id=None, chunk_size: int | None = None) -> list:
+    """
+    Apply a TRANSITIONS entry to every booking in queryset that is in one of its source states, chunk_size
+    bookings per UPDATE. Returns the (pk, booking_reference_id) pairs that moved; the rest are left alone.
+    """
+    declared = TRANSITIONS[name]
+    chunk_size = chunk_size or settings.BOOKING_TRANSITION_CHUNK_SIZE
+    moved = []
+    while True:
+        chunk = _update(queryset, declared, chunk_size)
+        if chunk:
+            _notify(name, declared.target, chunk, actor, app_user_id)
+            moved += chunk
+        # a short chunk means nothing eligible was left
+        if len(chunk) < chunk_size:
+            return moved
+
+def hire(user, **fields) -> Booking:
+    # the customer picked the provider, so a hire starts out assigned
+    booking = Booking.objects.create(user=user, status=ASSIGNED, **fields)
+    _notify('hire', ASSIGNED, [(booking.pk, booking.booking_reference_id)], user.email, user.pk)
+    return booking
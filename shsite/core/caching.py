@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.utils import timezone
+from .routers import use_primary
+
+HOME_SERVICES_KEY = 'home:services'
+HOME_PROVIDERS_KEY = 'home:providers'
+DIRECTORY_LAST_MODIFIED_KEY = 'providers:last_modified'
+PROVIDER_CARD_FRAGMENTS = ('home_provider_card', 'browse_provider_card')
+
+def provider_key(pk) -> str:
+    return f'provider:{pk}'
+
+def get_or_set(key, loader):
+    value = cache.get(key)
+    if value is None:
+        # a lagging replica would otherwise pin stale rows in the cache for the whole timeout
+        with use_primary():
+            value = loader()
+        cache.set(key, value, settings.PUBLIC_CACHE_TIMEOUT)
+    return value
+
+def cached_provider(pk):
+    return cache.get(provider_key(pk))
+
+def directory_last_modified():
+    # an evicted timestamp restarts at "now" so a deletion can never be hidden behind a stale 304
+    return get_or_set(DIRECTORY_LAST_MODIFIED_KEY, timezone.now)
+
+def invalidate_provider(pk):
+    keys = [HOME_SERVICES_KEY, HOME_PROVIDERS_KEY, provider_key(pk)]
+    keys += [make_template_fragment_key(name, [pk]) for name in PROVIDER_CARD_FRAGMENTS]
+    cache.delete_many(keys)
+    cache.set(DIRECTORY_LAST_MODIFIED_KEY, timezone.now(), settings.PUBLIC_CACHE_TIMEOUT)
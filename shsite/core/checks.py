@@ -0,0 +1,42 @@
+import re
+from django.core.checks import Error, Tags, register
+from django.db import connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+
+# plan lines that mean every booking row (or every one of the user's bookings) is read and sorted
+BAD_PLAN_PATTERNS = {
+    'sqlite': re.compile(r'SCAN core_booking\b|USE TEMP B-TREE FOR ORDER BY'),
+    'postgresql': re.compile(r'Seq Scan on core_booking\b|Sort Key: .*booking_datetime'),
+}
+
+@register(Tags.database)
+def dashboard_query_plan(app_configs, databases=None, **kwargs):
+    """
+    Run by `manage.py check --database default` in the Render build, as a deploy-time guard against
+    the real database. DashboardQueryPlanTests asserts the same plan against seeded bookings.
+    """
+    from .models import AppUser, Booking
+    errors = []
+    for alias in databases or []:
+        pattern = BAD_PLAN_PATTERNS.get(connections[alias].vendor)
+        if pattern is None:
+            continue
+        executor = MigrationExecutor(connections[alias])
+        if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+            # migrate runs this check too; the plan only means something once the schema is current
+            continue
+        queryset = Booking.objects.using(alias).for_dashboard(AppUser(pk=0))[:20]
+        with transaction.atomic(using=alias):
+            if connections[alias].vendor == 'postgresql':
+                # small tables are cheaper to scan, so ask whether an index can be used at all
+                with connections[alias].cursor() as cursor:
+                    cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = queryset.explain()
+        if pattern.search(plan):
+            errors.append(Error(
+                f'The user dashboard query scans or sorts the booking table on {alias!r}.',
+                hint=f'Expected booking_user_datetime_idx to be used. Plan:\n{plan}',
+                obj=Booking,
+                id='core.E001',
+            ))
+    return errors
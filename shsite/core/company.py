@@ -0,0 +1,20 @@
+import threading
+from .models import CompanyInfo
+
+_lock = threading.RLock()
+_company = None
+
+def get_company_info() -> CompanyInfo:
+    global _company
+    company = _company
+    if company is None:
+        with _lock:
+            if _company is None:
+                _company = CompanyInfo.objects.first() or CompanyInfo.objects.create()
+            company = _company
+    return company
+
+def clear_company_info_cache():
+    global _company
+    with _lock:
+        _company = None
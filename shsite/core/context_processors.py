@@ -1,12 +1,10 @@
-from .models import AppUser
+from django.utils.functional import SimpleLazyObject
+from .middleware import get_app_user
 
 def app_user(request):
-    u = None
-    if request.session.get('user_id'):
-        try:
-            u = AppUser.objects.filter(id=request.session['user_id']).first()
-        except Exception:
-            u = None
+    u = getattr(request, 'app_user', None)
+    if u is None:
+        u = SimpleLazyObject(lambda: get_app_user(request))
     return {
         'app_user': u,
         'app_role': request.session.get('role')
@@ -0,0 +1,46 @@
+import threading
+import time
+from django.conf import settings
+from .models import AllowedEmailDomain
+
+class EmailDomainPolicy:
+    # an address is allowed when the domain after its only '@' is exactly one of the listed
+    # domains: 'gmail.com' admits 'a@gmail.com' but not 'a@evil.gmail.com'. One set probe per call.
+    def __init__(self, domains):
+        self.domains = frozenset(filter(None, (self._normalize(d) for d in domains)))
+
+    @staticmethod
+    def _normalize(domain: str) -> str:
+        return domain.strip().lower().lstrip('@')
+
+    def allows(self, email: str) -> bool:
+        local, sep, domain = email.strip().partition('@')
+        # a second '@' stays in domain, so 'a@b@gmail.com' never matches
+        return bool(sep and local) and domain.lower() in self.domains
+
+_lock = threading.Lock()
+_policy = None
+_policy_loaded_at = 0.0
+
+def load_policy() -> EmailDomainPolicy:
+    domains = list(settings.ALLOWED_EMAIL_DOMAINS)
+    domains += AllowedEmailDomain.objects.filter(is_active=True).values_list('domain', flat=True)
+    return EmailDomainPolicy(domains)
+
+def get_policy() -> EmailDomainPolicy:
+    global _policy, _policy_loaded_at
+    policy = _policy
+    if policy is None or time.monotonic() - _policy_loaded_at > settings.EMAIL_POLICY_TTL:
+        with _lock:
+            _policy = policy = load_policy()
+            _policy_loaded_at = time.monotonic()
+    return policy
+
+def reload_policy():
+    # the editing worker reloads on its next check; other workers pick the change up within EMAIL_POLICY_TTL
+    global _policy
+    with _lock:
+        _policy = None
+
+def validate_email_domain(email: str) -> bool:
+    return get_policy().allows(email)
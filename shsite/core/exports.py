@@ -0,0 +1,96 @@
+import csv
+import io
+from django.conf import settings
+from django.utils import timezone
+from openpyxl import Workbook
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen.canvas import Canvas
+
+COLUMNS = (
+    ('Reference', 'booking_reference_id'),
+    ('Booked at', 'booking_datetime'),
+    ('Status', 'status'),
+    ('Service', 'service_name'),
+    ('Amount', 'final_amount'),
+    ('Customer', 'user__name'),
+    ('Customer email', 'user__email'),
+    ('Customer phone', 'user__phone'),
+    ('Provider', 'service_provider__name'),
+    ('Provider phone', 'service_provider__phone'),
+    ('Location', 'service_provider__location'),
+)
+HEADERS = [header for header, _ in COLUMNS]
+BOOKED_AT = 1
+
+# PDF layout: (column index, width in points) on a landscape A4 page
+PDF_COLUMNS = ((0, 80), (1, 85), (2, 55), (3, 120), (4, 50), (5, 110), (8, 130), (10, 120))
+PDF_FONT, PDF_FONT_SIZE, PDF_ROW_HEIGHT, PDF_MARGIN = 'Helvetica', 7, 10, 36
+
+def booking_rows(queryset, chunk_size: int | None = None):
+    """Yield one list per booking, joined with its user and provider, fetching chunk_size rows at a time."""
+    rows = queryset.order_by('pk').values_list(*(field for _, field in COLUMNS))
+    for row in rows.iterator(chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE):
+        row = list(row)
+        row[BOOKED_AT] = timezone.localtime(row[BOOKED_AT]).replace(tzinfo=None, microsecond=0)
+        yield row
+
+def csv_chunks(rows, chunk_bytes: int = 64 * 1024):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(HEADERS)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+def write_xlsx(rows, target):
+    # write-only workbooks stream rows to a temporary file instead of keeping cells in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('Bookings')
+    sheet.append(HEADERS)
+    for row in rows:
+        sheet.append(row)
+    workbook.save(target)
+
+def _fit(text: str, width: float) -> str:
+    if stringWidth(text, PDF_FONT, PDF_FONT_SIZE) <= width:
+        return text
+    while text and stringWidth(text + '…', PDF_FONT, PDF_FONT_SIZE) > width:
+        text = text[:-1]
+    return text + '…'
+
+def write_pdf(rows, target, max_rows: int | None = None):
+    # reportlab keeps every page until save(), so memory grows with the page count; cap it
+    max_rows = max_rows or settings.EXPORT_PDF_MAX_ROWS
+    page_width, page_height = landscape(A4)
+    canvas = Canvas(target, pagesize=(page_width, page_height), pageCompression=1)
+    canvas.setTitle('Bookings')
+
+    def draw(values, y):
+        x = PDF_MARGIN
+        for index, width in PDF_COLUMNS:
+            value = values[index]
+            canvas.drawString(x, y, _fit('' if value is None else str(value), width - 4))
+            x += width
+
+    def start_page():
+        canvas.setFont(PDF_FONT + '-Bold', PDF_FONT_SIZE)
+        draw(HEADERS, page_height - PDF_MARGIN)
+        canvas.setFont(PDF_FONT, PDF_FONT_SIZE)
+        return page_height - PDF_MARGIN - PDF_ROW_HEIGHT * 1.5
+
+    y = start_page()
+    for count, row in enumerate(rows):
+        if y < PDF_MARGIN:
+            canvas.showPage()
+            y = start_page()
+        if count == max_rows:
+            canvas.drawString(PDF_MARGIN, y, f'Only the first {max_rows} bookings are included; export CSV or Excel for the rest.')
+            break
+        draw(row, y)
+        y -= PDF_ROW_HEIGHT
+    canvas.save()
@@ -1,23 +1,19 @@
 from django import forms
-from django.utils import timezone
 from django.contrib.auth.hashers import make_password
 from .models import (
     AppUser,
     ServiceProvider,
+    Category,
     ServiceProviderCategory,
     Booking,
     CompanyInfo,
+    AllowedEmailDomain,
     PasswordReset,
+    OutboundEmail,
     AuditLog,
 )
-
-ALLOWED_DOMAINS = ['@edu', '@edu.in', '@ac.in', '@gov.in', '@nic.in', '@companyname.com', '@companyname.in', '@startupname.io', '@organization.org', '@college.edu', '@college.ac.in', '@rediffmail.com', '@yandex.com', '@gmail.com', '@yahoo.com', '@yahoo.co.in', '@outlook.com', '@hotmail.com', '@live.com', '@icloud.com', '@aol.com', '@protonmail.com', '@zoho.com']
-
-def validate_email_domain(email: str) -> bool:
-    if '@' not in email:
-        return False
-    domain = email[email.find('@'):]
-    return any(domain.endswith(d) for d in ALLOWED_DOMAINS)
+from .booking_refs import generate_booking_ref
+from .email_policy import validate_email_domain
 
 class AppUserForm(forms.ModelForm):
     raw_password = forms.CharField(label='Password', required=False, widget=forms.PasswordInput)
@@ -76,6 +72,11 @@ class ServiceProviderForm(forms.ModelForm):
             obj.save()
         return obj
 
+class CategoryForm(forms.ModelForm):
+    class Meta:
+        model = Category
+        fields = ['name', 'slug']
+
 class ServiceProviderCategoryForm(forms.ModelForm):
     class Meta:
         model = ServiceProviderCategory
@@ -84,38 +85,55 @@ class ServiceProviderCategoryForm(forms.ModelForm):
 class BookingForm(forms.ModelForm):
     class Meta:
         model = Booking
-        fields = ['booking_reference_id', 'user', 'service_provider', 'service_name', 'booking_datetime', 'status', 'final_amount']
+        fields = ['booking_reference_id', 'user', 'service_provider', 'service_name', 'category', 'booking_datetime', 'status', 'final_amount']
     def save(self, commit=True):
         obj = super().save(commit=False)
         if not obj.booking_reference_id:
-            year = str(timezone.now().year)
-            last = Booking.objects.filter(booking_reference_id__startswith=f'GS{year}-').order_by('-id').first()
-            if last:
-                last_num = int(last.booking_reference_id.split('-')[1])
-                new_num = f'{last_num + 1:06d}'
-            else:
-                new_num = '000001'
-            obj.booking_reference_id = f'GS{year}-{new_num}'
+            obj.booking_reference_id = generate_booking_ref()
         if commit:
             obj.save()
         return obj
 
+class AllowedEmailDomainForm(forms.ModelForm):
+    class Meta:
+        model = AllowedEmailDomain
+        fields = ['domain', 'is_active']
+    def clean_domain(self):
+        return self.cleaned_data.get('domain', '').strip().lower().lstrip('@')
+
 class CompanyInfoForm(forms.ModelForm):
     class Meta:
         model = CompanyInfo
         fields = ['company_name', 'owner', 'email', 'mobile', 'address', 'social_links']
 
 class PasswordResetForm(forms.ModelForm):
+    raw_token = forms.CharField(label='Token', required=False, help_text='Only a hash of the token is stored; leave blank to keep the current one.')
     class Meta:
         model = PasswordReset
-        fields = ['user', 'service_provider', 'token', 'expiry']
+        fields = ['user', 'service_provider', 'raw_token', 'expiry']
     def clean(self):
         cleaned = super().clean()
         if not cleaned.get('user') and not cleaned.get('service_provider'):
             raise forms.ValidationError('Either user or service provider must be set.')
+        if not cleaned.get('raw_token') and not self.instance.token_hash:
+            raise forms.ValidationError('A token is required for a new reset.')
         return cleaned
+    def save(self, commit=True):
+        obj = super().save(commit=False)
+        raw = self.cleaned_data.get('raw_token')
+        if raw:
+            obj.token_hash = PasswordReset.hash_token(raw)
+        if commit:
+            obj.save()
+        return obj
+
+class OutboundEmailForm(forms.ModelForm):
+    class Meta:
+        model = OutboundEmail
+        # no body: a queued password-reset mail holds a live reset link
+        fields = ['subject', 'from_email', 'to', 'status', 'attempts', 'next_attempt_at', 'last_error']
 
 class AuditLogForm(forms.ModelForm):
     class Meta:
         model = AuditLog
-        fields = ['admin', 'action', 'timestamp']
+        fields = ['admin', 'actor', 'action', 'timestamp']
@@ -0,0 +1,195 @@
+import atexit
+import bisect
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+PREFIX = 'shsite'
+# upper bounds, in seconds, of the request duration histogram
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+WORKERS_KEY = 'metrics:workers'
+# worker snapshots outlive their worker, so the totals summed over all workers never go backwards
+SNAPSHOT_TIMEOUT = 7 * 24 * 3600
+
+# per request: query count and time, template time and how often each SQL statement ran
+_request = ContextVar('request_metrics', default=None)
+
+# this worker's totals: request counts by (view, method, status), and per view the VIEW_TOTALS followed by the
+# duration histogram (a count per bucket, the +Inf count, then the sum)
+VIEW_TOTALS = ('db_queries_total', 'db_seconds_total', 'template_seconds_total', 'slow_queries_total', 'n_plus_one_total')
+_lock = threading.Lock()
+_requests = {}
+_views = {}
+_published_at = 0.0
+_worker = None
+
+def _worker_key() -> str:
+    global _worker
+    # pids are reused, and a forked worker must not overwrite its parent's snapshot
+    if _worker is None or _worker[0] != os.getpid():
+        _worker = (os.getpid(), f'metrics:worker:{os.getpid()}:{uuid.uuid4().hex[:8]}')
+    return _worker[1]
+
+def _execute(execute, sql, params, many, context):
+    state = _request.get()
+    if state is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        state['queries'] += 1
+        state['db'] += elapsed
+        # Django passes parameters separately, so the same statement shape is the same string
+        shapes = state['shapes']
+        shapes[sql] = shapes.get(sql, 0) + 1
+        if elapsed >= state['slow_query']:
+            state['slow_queries'] += 1
+            logger.warning('slow query path=%s duration_ms=%.1f sql=%s', state['path'], elapsed * 1000, sql[:500])
+
+def install(connection):
+    # once per connection object rather than a connection.execute_wrapper() block around every request
+    if _execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute)
+
+def start(request) -> dict:
+    state = {
+        'path': request.path, 'queries': 0, 'db': 0.0, 'template': 0.0, 'rendering': False,
+        'shapes': {}, 'slow_queries': 0, 'slow_query': settings.SLOW_QUERY_MS / 1000,
+    }
+    state['token'] = _request.set(state)
+    state['started'] = time.perf_counter()
+    return state
+
+def stop(state: dict):
+    state['duration'] = time.perf_counter() - state['started']
+    _request.reset(state['token'])
+
+@contextmanager
+def template_timer():
+    state = _request.get()
+    # only the outermost template: includes and nested render_to_string calls are part of it
+    if state is None or state['rendering']:
+        yield
+        return
+    state['rendering'] = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        state['template'] += time.perf_counter() - started
+        state['rendering'] = False
+
+def record(request, response, state):
+    """Add a finished request to the worker totals, log it and attach a Server-Timing header."""
+    match = request.resolver_match
+    # URL names, not paths, so every label set stays small
+    view = match.view_name if match else 'unresolved'
+    repeated_sql, repeats = max(state['shapes'].items(), key=lambda item: item[1], default=('', 0))
+    n_plus_one = repeats >= settings.N_PLUS_ONE_THRESHOLD
+    duration = state['duration']
+    key = (view, request.method, response.status_code)
+    with _lock:
+        _requests[key] = _requests.get(key, 0) + 1
+        totals = _views.get(view)
+        if totals is None:
+            totals = _views[view] = [0] * (len(VIEW_TOTALS) + len(BUCKETS) + 2)
+        totals[0] += state['queries']
+        totals[1] += state['db']
+        totals[2] += state['template']
+        totals[3] += state['slow_queries']
+        totals[4] += n_plus_one
+        totals[len(VIEW_TOTALS) + bisect.bisect_left(BUCKETS, duration)] += 1
+        totals[-1] += duration
+    if n_plus_one:
+        logger.warning('n+1 view=%s repeats=%d sql=%s', view, repeats, repeated_sql[:500])
+    # every request at DEBUG; slow ones at WARNING
+    level = logging.WARNING if duration >= settings.SLOW_REQUEST_MS / 1000 else logging.DEBUG
+    if logger.isEnabledFor(level):
+        logger.log(
+            level, 'request view=%s method=%s status=%s duration_ms=%.1f db_queries=%d db_ms=%.1f template_ms=%.1f',
+            view, request.method, response.status_code, duration * 1000, state['queries'], state['db'] * 1000, state['template'] * 1000,
+            extra={
+                'view': view, 'method': request.method, 'status': response.status_code, 'duration_ms': duration * 1000,
+                'db_queries': state['queries'], 'db_ms': state['db'] * 1000, 'template_ms': state['template'] * 1000,
+            },
+        )
+    if settings.SERVER_TIMING:
+        response['Server-Timing'] = (
+            f'db;dur={state["db"] * 1000:.1f};desc="{state["queries"]} queries", '
+            f'tpl;dur={state["template"] * 1000:.1f}, view;dur={duration * 1000:.1f}'
+        )
+    if time.monotonic() >= _published_at + settings.METRICS_PUBLISH_SECONDS:
+        publish()
+
+def _snapshot() -> dict:
+    with _lock:
+        return {'requests': dict(_requests), 'views': {view: list(totals) for view, totals in _views.items()}}
+
+def publish(force: bool = False):
+    """Store this worker's totals in the cache, where /metrics on any worker adds them up."""
+    global _published_at
+    with _lock:
+        if not force and time.monotonic() < _published_at + settings.METRICS_PUBLISH_SECONDS:
+            return
+        _published_at = time.monotonic()
+    key = _worker_key()
+    cache.set(key, _snapshot(), SNAPSHOT_TIMEOUT)
+    workers = cache.get(WORKERS_KEY) or []
+    if key not in workers:
+        cache.set(WORKERS_KEY, [*workers, key][-100:], SNAPSHOT_TIMEOUT)
+
+def collect() -> dict:
+    publish(force=True)
+    snapshots = cache.get_many(cache.get(WORKERS_KEY) or [])
+    if _worker_key() not in snapshots:
+        # a per-process cache (locmem) only ever holds this worker's totals
+        snapshots = {_worker_key(): _snapshot()}
+    requests, views = {}, {}
+    for snapshot in snapshots.values():
+        for key, count in snapshot['requests'].items():
+            requests[key] = requests.get(key, 0) + count
+        for view, totals in snapshot['views'].items():
+            combined = views.setdefault(view, [0] * len(totals))
+            for index, value in enumerate(totals):
+                combined[index] += value
+    return {'requests': requests, 'views': views}
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(**labels) -> str:
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+def render_metrics() -> str:
+    """The worker totals in the Prometheus text exposition format."""
+    metrics = collect()
+    views = sorted(metrics['views'].items())
+    lines = [f'# TYPE {PREFIX}_requests_total counter']
+    for (view, method, status), count in sorted(metrics['requests'].items()):
+        lines.append(f'{PREFIX}_requests_total{_labels(view=view, method=method, status=status)} {count}')
+    for index, name in enumerate(VIEW_TOTALS):
+        lines.append(f'# TYPE {PREFIX}_{name} counter')
+        lines += [f'{PREFIX}_{name}{_labels(view=view)} {totals[index]}' for view, totals in views]
+    name = f'{PREFIX}_request_duration_seconds'
+    lines.append(f'# TYPE {name} histogram')
+    for view, totals in views:
+        cumulative = 0
+        for bound, count in zip((*BUCKETS, '+Inf'), totals[len(VIEW_TOTALS):]):
+            cumulative += count
+            lines.append(f'{name}_bucket{_labels(view=view, le=bound)} {cumulative}')
+        lines.append(f'{name}_sum{_labels(view=view)} {totals[-1]}')
+        lines.append(f'{name}_count{_labels(view=view)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+# the last requests a worker served before exiting still count
+atexit.register(publish, force=True)
@@ -0,0 +1,81 @@
+import logging
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+def queue_mail(subject: str, body: str, from_email: str, recipient_list) -> OutboundEmail:
+    return OutboundEmail.objects.create(subject=subject, body=body, from_email=from_email, to=','.join(recipient_list))
+
+def _backoff(attempts: int) -> timedelta:
+    return timedelta(seconds=min(settings.MAIL_QUEUE_RETRY_BASE_SECONDS * 2 ** (attempts - 1), settings.MAIL_QUEUE_RETRY_MAX_SECONDS))
+
+def _lease(batch_size: int) -> timedelta:
+    # the longest a batch can take, with the connect and every send running into EMAIL_TIMEOUT
+    return timedelta(seconds=(batch_size + 1) * settings.EMAIL_TIMEOUT + 60)
+
+def _claim(batch_size: int) -> list:
+    now = timezone.now()
+    with transaction.atomic():
+        batch = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            # 'sending' rows whose lease ran out belong to a worker that died mid-batch
+            .filter(status__in=('pending', 'sending'), next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        OutboundEmail.objects.filter(pk__in=[email.pk for email in batch]).update(status='sending', next_attempt_at=now + _lease(len(batch)))
+    return batch
+
+def send_queued_mail(batch_size: int = 50) -> dict:
+    """
+    Send up to batch_size due emails over one connection. Rows are claimed in one short transaction and
+    their results written in another, so no transaction or row lock is held while SMTP is talking.
+    """
+    metrics = {'sent': 0, 'retried': 0, 'failed': 0}
+    batch = _claim(batch_size)
+    if not batch:
+        return metrics
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+        open_error = None
+    except Exception as exc:
+        open_error = exc
+    try:
+        for email in batch:
+            email.attempts += 1
+            try:
+                if open_error:
+                    raise open_error
+                EmailMessage(email.subject, email.body, email.from_email, email.to.split(','), connection=connection).send()
+            except Exception as exc:
+                email.last_error = repr(exc)
+                if email.attempts >= settings.MAIL_QUEUE_MAX_ATTEMPTS:
+                    email.status = 'failed'
+                    metrics['failed'] += 1
+                else:
+                    email.status = 'pending'
+                    email.next_attempt_at = timezone.now() + _backoff(email.attempts)
+                    metrics['retried'] += 1
+            else:
+                email.status = 'sent'
+                email.sent_at = timezone.now()
+                email.last_error = ''
+                metrics['sent'] += 1
+            if email.status != 'pending':
+                # a password-reset body carries a live link; keep it only while it may still be sent
+                email.body = ''
+    finally:
+        if not open_error:
+            try:
+                connection.close()
+            except Exception:
+                # QUIT can time out on a server that stopped answering; the results still get recorded
+                logger.warning('closing the mail connection failed', exc_info=True)
+    OutboundEmail.objects.bulk_update(batch, ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at', 'body'])
+    logger.info('mail queue batch sent=%d retried=%d failed=%d', metrics['sent'], metrics['retried'], metrics['failed'], extra=metrics)
+    return metrics
@@ -0,0 +1,33 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from core.models import AuditLog, AuditLogArchive
+
+FIELDS = ('id', 'admin_id', 'actor', 'action', 'timestamp')
+
+class Command(BaseCommand):
+    help = "Move audit entries older than AUDIT_LOG_RETENTION_DAYS to the archive table in small batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help='Keep this many days in AuditLog (AUDIT_LOG_RETENTION_DAYS)')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between chunks')
+
+    def handle(self, *args, **options):
+        days = settings.AUDIT_LOG_RETENTION_DAYS if options['days'] is None else options['days']
+        cutoff = timezone.now() - timedelta(days=days)
+        total = 0
+        while True:
+            with transaction.atomic():
+                rows = list(AuditLog.objects.filter(timestamp__lt=cutoff).order_by('-timestamp').values(*FIELDS)[:options['chunk_size']])
+                if not rows:
+                    break
+                AuditLogArchive.objects.bulk_create([AuditLogArchive(**row) for row in rows])
+                AuditLog.objects.filter(id__in=[row['id'] for row in rows]).delete()
+            total += len(rows)
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Archived {total} audit entries older than {cutoff:%Y-%m-%d %H:%M}'))
@@ -0,0 +1,48 @@
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from core import exports
+from core.models import Booking
+
+class Command(BaseCommand):
+    help = "Export bookings with customer and provider details to CSV, XLSX or PDF"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='File to write, or - for CSV on stdout')
+        parser.add_argument('--format', choices=['csv', 'xlsx', 'pdf'], help='Defaults to the output file extension')
+        parser.add_argument('--status', help='Only export bookings with this status')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Rows fetched per query (EXPORT_CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        output = options['output']
+        fmt = options['format'] or ('csv' if output == '-' else output.rsplit('.', 1)[-1].lower())
+        if fmt not in ('csv', 'xlsx', 'pdf'):
+            raise CommandError('Pass --format csv, xlsx or pdf')
+        if output == '-' and fmt != 'csv':
+            raise CommandError('Only CSV can be written to stdout')
+        queryset = Booking.objects.all()
+        if options['status']:
+            queryset = queryset.filter(status=options['status'])
+        count = 0
+
+        def counted(rows):
+            nonlocal count
+            for row in rows:
+                count += 1
+                yield row
+
+        rows = counted(exports.booking_rows(queryset, options['chunk_size']))
+        if fmt == 'csv':
+            stream = sys.stdout if output == '-' else open(output, 'w', newline='', encoding='utf-8')
+            try:
+                for chunk in exports.csv_chunks(rows):
+                    stream.write(chunk)
+            finally:
+                if stream is not sys.stdout:
+                    stream.close()
+        elif fmt == 'xlsx':
+            exports.write_xlsx(rows, output)
+        else:
+            exports.write_pdf(rows, output)
+            count = min(count, settings.EXPORT_PDF_MAX_ROWS)
+        self.stderr.write(self.style.SUCCESS(f'Exported {count} bookings to {output}'))
@@ -0,0 +1,31 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.models import OutboundEmail
+
+class Command(BaseCommand):
+    help = "Delete sent and failed outbound mail older than MAIL_QUEUE_RETENTION_DAYS in small batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help='Keep this many days of sent and failed mail (MAIL_QUEUE_RETENTION_DAYS)')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between chunks')
+
+    def handle(self, *args, **options):
+        days = settings.MAIL_QUEUE_RETENTION_DAYS if options['days'] is None else options['days']
+        cutoff = timezone.now() - timedelta(days=days)
+        total = 0
+        while True:
+            ids = list(
+                OutboundEmail.objects.filter(status__in=('sent', 'failed'), created_at__lt=cutoff)
+                .order_by('id').values_list('id', flat=True)[:options['chunk_size']]
+            )
+            if not ids:
+                break
+            deleted, _ = OutboundEmail.objects.filter(id__in=ids).delete()
+            total += deleted
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {total} sent or failed emails older than {cutoff:%Y-%m-%d %H:%M}'))
@@ -0,0 +1,24 @@
+import time
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.models import PasswordReset
+
+class Command(BaseCommand):
+    help = "Delete expired password reset tokens in small batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between chunks')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now()
+        total = 0
+        while True:
+            ids = list(PasswordReset.objects.filter(expiry__lt=cutoff).order_by('expiry').values_list('id', flat=True)[:options['chunk_size']])
+            if not ids:
+                break
+            deleted, _ = PasswordReset.objects.filter(id__in=ids).delete()
+            total += deleted
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {total} expired password resets'))
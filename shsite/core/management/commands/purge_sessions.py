@@ -0,0 +1,31 @@
+import time
+from importlib import import_module
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+class Command(BaseCommand):
+    help = "Delete expired sessions in small batches (db and cached_db session backends)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between chunks')
+
+    def handle(self, *args, **options):
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not hasattr(store, 'get_model_class'):
+            # cache entries expire on their own and signed cookies are never stored server side
+            self.stdout.write(f'{settings.SESSION_ENGINE} keeps no session table; nothing to purge')
+            return
+        Session = store.get_model_class()
+        cutoff = timezone.now()
+        total = 0
+        while True:
+            keys = list(Session.objects.filter(expire_date__lt=cutoff).order_by('expire_date').values_list('session_key', flat=True)[:options['chunk_size']])
+            if not keys:
+                break
+            deleted, _ = Session.objects.filter(session_key__in=keys).delete()
+            total += deleted
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {total} expired sessions'))
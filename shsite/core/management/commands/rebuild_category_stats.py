@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from core.models import ServiceCategoryStats
+from core.stats import rebuild_category_stats
+
+class Command(BaseCommand):
+    help = "Recompute ServiceCategoryStats from all service provider categories"
+
+    def handle(self, *args, **options):
+        rebuild_category_stats()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats for {ServiceCategoryStats.objects.count()} categories'))
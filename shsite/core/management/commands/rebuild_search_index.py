@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from core import search
+
+class Command(BaseCommand):
+    help = "Rebuild the provider/service full-text search index"
+
+    def handle(self, *args, **options):
+        search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
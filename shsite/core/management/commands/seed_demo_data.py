@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
+from core import search
+from core.models import Category, ServiceProvider, ServiceProviderCategory
+from core.stats import refresh_category_stats
+
+class Command(BaseCommand):
+    help = "Create demo service providers when the directory is empty"
+
+    def handle(self, *args, **options):
+        if ServiceProvider.objects.exists():
+            self.stdout.write('Service providers already exist, skipping demo data')
+            return
+        p1 = ServiceProvider.objects.create(name='Rahul Kumar', phone='9876543210', password=make_password('pass123'), location='Janjgir, CG')
+        p2 = ServiceProvider.objects.create(name='Sita Devi', phone='9123456780', password=make_password('pass123'), location='Pamgarh, CG')
+        p3 = ServiceProvider.objects.create(name='Arjun Verma', phone='9001122334', password=make_password('pass123'), location='Champa, CG')
+        categories = ServiceProviderCategory.objects.bulk_create([
+            ServiceProviderCategory(provider=p1, category=Category.for_name('Electrician'), category_name='Electrician'),
+            ServiceProviderCategory(provider=p1, category=Category.for_name('AC Repair'), category_name='AC Repair'),
+            ServiceProviderCategory(provider=p2, category=Category.for_name('Plumber'), category_name='Plumber'),
+            ServiceProviderCategory(provider=p2, category=Category.for_name('Water Purifier'), category_name='Water Purifier'),
+            ServiceProviderCategory(provider=p3, category=Category.for_name('Carpenter'), category_name='Carpenter'),
+        ])
+        for provider in (p1, p2, p3):
+            search.index_provider(provider.pk)
+        refresh_category_stats(*(c.category_name for c in categories))
+        self.stdout.write(self.style.SUCCESS('Created demo service providers'))
@@ -0,0 +1,31 @@
+import time
+from django.core.management.base import BaseCommand
+from core.mail import send_queued_mail
+
+class Command(BaseCommand):
+    help = "Send pending OutboundEmail rows in batches over one SMTP connection"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument('--loop', action='store_true', help='Keep draining the queue until interrupted')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep when the queue is empty')
+
+    def handle(self, *args, **options):
+        totals = {'sent': 0, 'retried': 0, 'failed': 0}
+        while True:
+            started = time.monotonic()
+            metrics = send_queued_mail(options['batch_size'])
+            for key, value in metrics.items():
+                totals[key] += value
+            if any(metrics.values()):
+                self.stdout.write(
+                    f"sent={metrics['sent']} retried={metrics['retried']} failed={metrics['failed']} "
+                    f"batch_seconds={time.monotonic() - started:.3f}"
+                )
+            if not options['loop']:
+                break
+            if sum(metrics.values()) < options['batch_size']:
+                time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Totals: sent={totals['sent']} retried={totals['retried']} failed={totals['failed']}"
+        ))
@@ -0,0 +1,81 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from . import instrumentation
+from .models import AppUser
+from .routers import PIN_COOKIE, replica_aliases, replica_reads
+
+def app_user_cache_key(user_id) -> str:
+    return f'app_user:{user_id}'
+
+def get_app_user(request):
+    if not hasattr(request, '_app_user'):
+        user_id = request.session.get('user_id')
+        request._app_user = AppUser.objects.filter(id=user_id).first() if user_id else None
+    return request._app_user
+
+def _get_template_user(request):
+    if hasattr(request, '_app_user'):
+        return request._app_user
+    user_id = request.session.get('user_id')
+    ttl = getattr(settings, 'APP_USER_CACHE_TTL', 0)
+    if not user_id or not ttl:
+        return get_app_user(request)
+    summary = cache.get(app_user_cache_key(user_id))
+    if summary is None:
+        user = get_app_user(request)
+        if user is None:
+            return None
+        summary = {'name': user.name, 'role': user.role}
+        cache.set(app_user_cache_key(user_id), summary, ttl)
+        return user
+    return AppUser(id=user_id, **summary)
+
+class AppUserMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        request.app_user = SimpleLazyObject(lambda: _get_template_user(request))
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        request.app_user = SimpleLazyObject(lambda: _get_template_user(request))
+        return await self.get_response(request)
+
+class ReplicaMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not replica_aliases():
+            return self.get_response(request)
+        # a client that wrote in the last REPLICA_PIN_SECONDS reads from the primary to see its own changes
+        safe = request.method in ('GET', 'HEAD', 'OPTIONS') and PIN_COOKIE not in request.COOKIES
+        with replica_reads(safe) as state:
+            response = self.get_response(request)
+        if state['wrote']:
+            response.set_cookie(PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax', secure=settings.SESSION_COOKIE_SECURE)
+        return response
+
+class InstrumentationMiddleware:
+    # query count and time, template time and total time per URL name; see core.instrumentation
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = instrumentation.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            instrumentation.stop(state)
+        instrumentation.record(request, response, state)
+        return response
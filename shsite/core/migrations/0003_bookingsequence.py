@@ -0,0 +1,34 @@
+# Generated by Django 5.0 on 2026-10-18 07:29
+
+from django.db import migrations, models
+
+
+def seed_sequences(apps, schema_editor):
+    Booking = apps.get_model('core', 'Booking')
+    BookingSequence = apps.get_model('core', 'BookingSequence')
+    last_values = {}
+    for ref in Booking.objects.filter(booking_reference_id__startswith='GS').values_list('booking_reference_id', flat=True).iterator():
+        prefix, _, num = ref.partition('-')
+        year = prefix[2:]
+        if not (year.isdigit() and num.isdigit()):
+            continue
+        last_values[int(year)] = max(last_values.get(int(year), 0), int(num))
+    BookingSequence.objects.bulk_create([BookingSequence(year=y, last_value=v) for y, v in last_values.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_serviceprovidercategory_description_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingSequence',
+            fields=[
+                ('year', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('last_value', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(seed_sequences, migrations.RunPython.noop),
+    ]
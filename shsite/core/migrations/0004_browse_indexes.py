@@ -0,0 +1,25 @@
+# Generated by Django 5.0 on 2026-10-18 07:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_bookingsequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='serviceprovider',
+            index=models.Index(fields=['name', 'id'], name='provider_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serviceprovider',
+            index=models.Index(fields=['location', 'name', 'id'], name='provider_location_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='serviceprovidercategory',
+            index=models.Index(fields=['category_name', 'provider'], name='category_name_provider_idx'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.0 on 2026-10-18 07:41
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# frozen copies of core.search as it stood here, so later changes to that module leave this migration alone
+FTS_TABLE = 'core_search_fts'
+
+PG_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(c.category_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(p.name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(p.location, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(c.description, '')), 'C')"
+)
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f'UPDATE core_serviceprovidercategory AS c SET search_vector = {PG_DOCUMENT} '
+                'FROM core_serviceprovider AS p WHERE p.id = c.provider_id'
+            )
+            cursor.execute('CREATE INDEX IF NOT EXISTS core_category_search_gin ON core_serviceprovidercategory USING gin (search_vector)')
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "category_name, description, provider_name, location, tokenize='unicode61', prefix='2 3')"
+            )
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, category_name, description, provider_name, location) '
+                'SELECT c.id, c.category_name, c.description, p.name, p.location '
+                'FROM core_serviceprovidercategory AS c JOIN core_serviceprovider AS p ON p.id = c.provider_id'
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('DROP INDEX IF EXISTS core_category_search_gin')
+        elif connection.vendor == 'sqlite':
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_browse_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviceprovidercategory',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
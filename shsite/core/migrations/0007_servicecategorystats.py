@@ -0,0 +1,35 @@
+# Generated by Django 5.0 on 2026-10-18 07:37
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, Max, Min
+
+
+def populate_stats(apps, schema_editor):
+    ServiceProviderCategory = apps.get_model('core', 'ServiceProviderCategory')
+    ServiceCategoryStats = apps.get_model('core', 'ServiceCategoryStats')
+    rows = ServiceProviderCategory.objects.values('category_name').annotate(
+        provider_count=Count('id'), min_rent=Min('rent_value'), max_rent=Max('rent_value'), avg_rent=Avg('rent_value'),
+    ).order_by()
+    ServiceCategoryStats.objects.bulk_create([ServiceCategoryStats(**row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServiceCategoryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category_name', models.CharField(max_length=100, unique=True)),
+                ('provider_count', models.PositiveIntegerField(default=0)),
+                ('min_rent', models.FloatField(blank=True, null=True)),
+                ('max_rent', models.FloatField(blank=True, null=True)),
+                ('avg_rent', models.FloatField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(populate_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,82 @@
+from collections import Counter, defaultdict
+
+from django.db import migrations, transaction
+from django.db.models import Avg, Count, Max, Min
+from django.utils.text import slugify
+
+
+# frozen copies of core.search as it stood here, so later changes to that module leave this migration alone
+FTS_TABLE = 'core_search_fts'
+
+PG_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(c.category_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(p.name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(p.location, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(c.description, '')), 'C')"
+)
+
+
+def rebuild_category_stats(apps):
+    ServiceProviderCategory = apps.get_model('core', 'ServiceProviderCategory')
+    ServiceCategoryStats = apps.get_model('core', 'ServiceCategoryStats')
+    rows = ServiceProviderCategory.objects.values('category_name').annotate(
+        provider_count=Count('id'), min_rent=Min('rent_value'), max_rent=Max('rent_value'), avg_rent=Avg('rent_value'),
+    ).order_by()
+    with transaction.atomic():
+        ServiceCategoryStats.objects.all().delete()
+        ServiceCategoryStats.objects.bulk_create([ServiceCategoryStats(**row) for row in rows], batch_size=1000)
+
+
+def rebuild_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f'UPDATE core_serviceprovidercategory AS c SET search_vector = {PG_DOCUMENT} '
+                'FROM core_serviceprovider AS p WHERE p.id = c.provider_id'
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, category_name, description, provider_name, location) '
+                'SELECT c.id, c.category_name, c.description, p.name, p.location '
+                'FROM core_serviceprovidercategory AS c JOIN core_serviceprovider AS p ON p.id = c.provider_id'
+            )
+
+
+def dedupe_categories(apps, schema_editor):
+    Category = apps.get_model('core', 'Category')
+    ServiceProviderCategory = apps.get_model('core', 'ServiceProviderCategory')
+    Booking = apps.get_model('core', 'Booking')
+
+    spellings = defaultdict(Counter)
+    stored_names = defaultdict(set)
+    for name in ServiceProviderCategory.objects.values_list('category_name', flat=True).iterator():
+        slug = slugify(name, allow_unicode=True)[:100] or 'other'
+        spellings[slug][name.strip()[:100]] += 1
+        stored_names[slug].add(name)
+    for slug, names in spellings.items():
+        # the most common spelling; ties go to a title-cased one, then alphabetically
+        canonical = min(names, key=lambda name: (-names[name], name != name.title(), name))
+        category, _ = Category.objects.get_or_create(slug=slug, defaults={'name': canonical})
+        ServiceProviderCategory.objects.filter(category_name__in=stored_names[slug]).update(category=category, category_name=category.name)
+
+    by_slug = dict(Category.objects.values_list('slug', 'id'))
+    service_names = Booking.objects.filter(category__isnull=True).values_list('service_name', flat=True).distinct()
+    for service_name in list(service_names):
+        category_id = by_slug.get(slugify(service_name, allow_unicode=True)[:100])
+        if category_id:
+            Booking.objects.filter(category__isnull=True, service_name=service_name).update(category_id=category_id)
+
+    rebuild_category_stats(apps)
+    rebuild_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_category'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_categories, migrations.RunPython.noop),
+    ]
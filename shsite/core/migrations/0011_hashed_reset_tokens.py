@@ -0,0 +1,43 @@
+# Generated by Django 5.0 on 2026-10-18 07:52
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def hash_existing_tokens(apps, schema_editor):
+    PasswordReset = apps.get_model('core', 'PasswordReset')
+    resets = list(PasswordReset.objects.only('id', 'token'))
+    for reset in resets:
+        reset.token_hash = hashlib.sha256(reset.token.encode()).hexdigest()
+    PasswordReset.objects.bulk_update(resets, ['token_hash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_outboundemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='passwordreset',
+            name='token_hash',
+            field=models.CharField(max_length=64, null=True),
+        ),
+        migrations.RunPython(hash_existing_tokens, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='passwordreset',
+            name='token',
+        ),
+        migrations.AlterField(
+            model_name='passwordreset',
+            name='token_hash',
+            field=models.CharField(max_length=64, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='passwordreset',
+            name='expiry',
+            field=models.DateTimeField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0 on 2026-10-18 07:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_hashed_reset_tokens'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AllowedEmailDomain',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=253, unique=True)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0 on 2026-10-18 08:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['-booking_datetime'], name='booking_datetime_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.0 on 2026-10-18 08:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def name_existing_actors(apps, schema_editor):
+    AuditLog = apps.get_model('core', 'AuditLog')
+    AppUser = apps.get_model('core', 'AppUser')
+    AuditLog.objects.update(actor=models.Subquery(AppUser.objects.filter(pk=models.OuterRef('admin_id')).values('email')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_booking_datetime_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='actor',
+            field=models.CharField(blank=True, max_length=254),
+        ),
+        migrations.RunPython(name_existing_actors, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='admin',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.appuser'),
+        ),
+        migrations.CreateModel(
+            name='AuditLogArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('actor', models.CharField(blank=True, max_length=254)),
+                ('action', models.TextField()),
+                ('timestamp', models.DateTimeField()),
+                ('admin', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.appuser')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-timestamp'], name='auditlog_archive_ts_idx')],
+            },
+        ),
+    ]
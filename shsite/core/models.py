@@ -1,5 +1,8 @@
+import hashlib
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.utils import timezone
+from django.utils.text import slugify
 
 class AppUser(models.Model):
     name = models.CharField(max_length=150)
@@ -8,6 +11,10 @@ class AppUser(models.Model):
     password = models.CharField(max_length=256)
     address = models.CharField(max_length=200, blank=True)
     role = models.CharField(max_length=50, default='user')
+    class Meta:
+        indexes = [
+            models.Index(fields=['role'], name='appuser_role_idx'),
+        ]
     def __str__(self):
         return self.name
 
@@ -17,29 +24,107 @@ class ServiceProvider(models.Model):
     password = models.CharField(max_length=256)
     location = models.CharField(max_length=200, blank=True)
     role = models.CharField(max_length=50, default='service_provider')
+    updated_at = models.DateTimeField(auto_now=True)
+    class Meta:
+        indexes = [
+            models.Index(fields=['name', 'id'], name='provider_name_id_idx'),
+            models.Index(fields=['location', 'name', 'id'], name='provider_location_name_id_idx'),
+        ]
     def __str__(self):
         return self.name
 
+class Category(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    slug = models.SlugField(max_length=100, unique=True, allow_unicode=True)
+    class Meta:
+        verbose_name_plural = 'categories'
+    def __str__(self):
+        return self.name
+    @staticmethod
+    def slug_for(name: str) -> str:
+        return slugify(name, allow_unicode=True)[:100] or 'other'
+    @classmethod
+    def for_name(cls, name: str):
+        category, _ = cls.objects.get_or_create(slug=cls.slug_for(name), defaults={'name': name.strip()[:100]})
+        return category
+
 class ServiceProviderCategory(models.Model):
     provider = models.ForeignKey(ServiceProvider, on_delete=models.CASCADE, related_name='categories')
+    category = models.ForeignKey(Category, on_delete=models.PROTECT, null=True, blank=True, related_name='provider_categories')
     category_name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
     rent_value = models.FloatField(null=True, blank=True)
     other_charges = models.FloatField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+    class Meta:
+        indexes = [
+            models.Index(fields=['category_name', 'provider'], name='category_name_provider_idx'),
+            models.Index(fields=['category', 'provider'], name='category_provider_idx'),
+        ]
+    def __str__(self):
+        return self.category_name
+    def save(self, *args, **kwargs):
+        self.category = Category.for_name(self.category_name)
+        self.category_name = self.category.name
+        super().save(*args, **kwargs)
+
+class ServiceCategoryStats(models.Model):
+    category_name = models.CharField(max_length=100, unique=True)
+    provider_count = models.PositiveIntegerField(default=0)
+    min_rent = models.FloatField(null=True, blank=True)
+    max_rent = models.FloatField(null=True, blank=True)
+    avg_rent = models.FloatField(null=True, blank=True)
     def __str__(self):
         return self.category_name
 
+class BookingQuerySet(models.QuerySet):
+    def for_dashboard(self, user):
+        return (
+            self.filter(user=user)
+            .select_related('service_provider')
+            .prefetch_related(models.Prefetch('service_provider__categories', queryset=ServiceProviderCategory.objects.only('id', 'provider_id', 'category_name')))
+            .only(
+                'id', 'booking_reference_id', 'service_name', 'booking_datetime', 'status', 'final_amount',
+                'service_provider__id', 'service_provider__name', 'service_provider__phone', 'service_provider__location',
+            )
+            .order_by('-booking_datetime', '-id')
+        )
+
 class Booking(models.Model):
     booking_reference_id = models.CharField(max_length=20, unique=True)
     user = models.ForeignKey(AppUser, on_delete=models.CASCADE)
     service_provider = models.ForeignKey(ServiceProvider, on_delete=models.CASCADE)
     service_name = models.CharField(max_length=150)
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='bookings')
     booking_datetime = models.DateTimeField(default=timezone.now)
     status = models.CharField(max_length=50, default='pending')
     final_amount = models.FloatField(null=True, blank=True)
+    objects = BookingQuerySet.as_manager()
+    class Meta:
+        indexes = [
+            # matches for_dashboard(): filter on user, newest first
+            models.Index(fields=['user', '-booking_datetime', '-id'], name='booking_user_datetime_idx'),
+            models.Index(fields=['service_provider', 'status'], name='booking_provider_status_idx'),
+            models.Index(fields=['status'], name='booking_status_idx'),
+            # admin ordering and date hierarchy
+            models.Index(fields=['-booking_datetime'], name='booking_datetime_idx'),
+        ]
     def __str__(self):
         return self.booking_reference_id
 
+class BookingSequence(models.Model):
+    year = models.PositiveIntegerField(primary_key=True)
+    last_value = models.PositiveBigIntegerField(default=0)
+    def __str__(self):
+        return f'GS{self.year}-{self.last_value:06d}'
+
+class AllowedEmailDomain(models.Model):
+    domain = models.CharField(max_length=253, unique=True)
+    is_active = models.BooleanField(default=True)
+    def __str__(self):
+        return self.domain
+
 class CompanyInfo(models.Model):
     company_name = models.CharField(max_length=150, default='Arrival Unscripted')
     owner = models.CharField(max_length=150, default='Toshendra Kumar')
@@ -53,14 +138,55 @@ class CompanyInfo(models.Model):
 class PasswordReset(models.Model):
     user = models.ForeignKey(AppUser, on_delete=models.CASCADE, null=True, blank=True)
     service_provider = models.ForeignKey(ServiceProvider, on_delete=models.CASCADE, null=True, blank=True)
-    token = models.CharField(max_length=200)
-    expiry = models.DateTimeField()
+    token_hash = models.CharField(max_length=64, unique=True)
+    expiry = models.DateTimeField(db_index=True)
+    def __str__(self):
+        return self.token_hash
+    @staticmethod
+    def hash_token(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+class OutboundEmail(models.Model):
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.TextField()
+    status = models.CharField(max_length=20, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_email_due_idx'),
+        ]
     def __str__(self):
-        return self.token
+        return f'{self.subject} -> {self.to}'
 
 class AuditLog(models.Model):
-    admin = models.ForeignKey(AppUser, on_delete=models.CASCADE)
+    # the AppUser who acted; Django admin staff have no AppUser and are only named in actor
+    admin = models.ForeignKey(AppUser, on_delete=models.SET_NULL, null=True, blank=True)
+    actor = models.CharField(max_length=254, blank=True)
     action = models.TextField()
     timestamp = models.DateTimeField(default=timezone.now)
+    class Meta:
+        indexes = [
+            models.Index(fields=['-timestamp'], name='auditlog_timestamp_idx'),
+        ]
+    def __str__(self):
+        return f'{self.actor} {self.timestamp.isoformat()}'
+
+class AuditLogArchive(models.Model):
+    # entries moved out of AuditLog by archive_audit_log, keeping their original ids
+    id = models.BigIntegerField(primary_key=True)
+    admin = models.ForeignKey(AppUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    actor = models.CharField(max_length=254, blank=True)
+    action = models.TextField()
+    timestamp = models.DateTimeField()
+    class Meta:
+        indexes = [
+            models.Index(fields=['-timestamp'], name='auditlog_archive_ts_idx'),
+        ]
     def __str__(self):
-        return f'{self.admin.email} {self.timestamp.isoformat()}'
+        return f'{self.actor} {self.timestamp.isoformat()}'
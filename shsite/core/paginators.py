@@ -0,0 +1,88 @@
+from math import ceil
+from django.conf import settings
+from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
+from django.db import connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+def estimated_row_count(queryset) -> int | None:
+    """Cheap whole-table row estimate: planner statistics on PostgreSQL, the highest id elsewhere."""
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        # -1 until the table has been vacuumed or analyzed
+        return row[0] if row and row[0] >= 0 else None
+    if queryset.model._meta.pk.get_internal_type() in ('AutoField', 'BigAutoField'):
+        return queryset.model._default_manager.using(queryset.db).aggregate(last=Max('pk'))['last'] or 0
+    return None
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Admin paginator for very large tables. An unfiltered changelist uses the estimate above once
+    it passes ADMIN_EXACT_COUNT_LIMIT rows; a filtered one counts at most that many rows plus one.
+    Neither is a real total, so past the limit any page number is accepted and each page fetches
+    one row more than it shows to learn whether another page follows.
+    """
+    estimated = False
+    # (page number, whether more rows follow) for the last page fetched past the limit
+    fetched = None
+
+    @cached_property
+    def count(self):
+        limit = settings.ADMIN_EXACT_COUNT_LIMIT
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset)
+            if estimate is not None and estimate > limit:
+                self.estimated = True
+                return estimate
+        # the changelist ordering only slows the capped count down
+        return queryset.order_by()[:limit + 1].count()
+
+    @property
+    def count_is_exact(self) -> bool:
+        return self.count <= settings.ADMIN_EXACT_COUNT_LIMIT
+
+    @property
+    def approximate_count(self) -> str:
+        """What the changelist shows instead of a count it does not know; empty when it does."""
+        if self.count_is_exact:
+            return ''
+        if self.estimated:
+            return f'about {self.count:,}'
+        return f'more than {settings.ADMIN_EXACT_COUNT_LIMIT:,}'
+
+    @property
+    def num_pages(self):
+        pages = ceil(max(1, self.count - self.orphans) / self.per_page)
+        if self.count_is_exact or self.fetched is None:
+            return 0 if self.count == 0 and not self.allow_empty_first_page else pages
+        # what the fetched page found overrides the estimate or the cap
+        number, more = self.fetched
+        return max(pages, number + 1) if more else number
+
+    def validate_number(self, number):
+        if self.count_is_exact:
+            return super().validate_number(number)
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger(self.error_messages['invalid_page'])
+        if number < 1:
+            raise EmptyPage(self.error_messages['min_page'])
+        return number
+
+    def page(self, number):
+        if self.count_is_exact:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage(self.error_messages['no_results'])
+        self.fetched = (number, len(rows) > self.per_page)
+        return self._get_page(rows[:self.per_page], number, self)
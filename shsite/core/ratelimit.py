@@ -0,0 +1,83 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+def parse_rate(rate: str):
+    match = re.fullmatch(r'(\d+)/(\d*)([smhd])', rate.strip())
+    if not match:
+        raise ValueError(f'Invalid rate {rate!r}, expected e.g. "10/m" or "5/15m"')
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * PERIODS[unit]
+
+# fallback counters for when the cache backend is unreachable; least recently used keys are evicted
+class LocalWindows:
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self.lock = threading.Lock()
+        self.windows = OrderedDict()
+
+    def counts(self, key: str, window: int):
+        with self.lock:
+            start, current, previous = self.windows.pop(key, (window, 0, 0))
+            if start != window:
+                previous, current = (current if start == window - 1 else 0), 0
+            current += 1
+            self.windows[key] = (window, current, previous)
+            if len(self.windows) > self.max_keys:
+                self.windows.popitem(last=False)
+            return current, previous
+
+_local = LocalWindows(getattr(settings, 'RATELIMIT_LOCAL_MAX_KEYS', 10000))
+
+def _cache_counts(key: str, window: int, period: int):
+    current_key = f'rl:{key}:{window}'
+    cache.add(current_key, 0, period * 2)
+    current = cache.incr(current_key)
+    previous = cache.get(f'rl:{key}:{window - 1}', 0)
+    return current, previous
+
+def hit(key: str, limit: int, period: int) -> bool:
+    now = time.time()
+    window = int(now // period)
+    try:
+        current, previous = _cache_counts(key, window, period)
+    except Exception:
+        current, previous = _local.counts(key, window)
+    elapsed = (now % period) / period
+    return previous * (1 - elapsed) + current <= limit
+
+def client_ip(request) -> str:
+    proxies = settings.RATELIMIT_PROXY_COUNT
+    if proxies:
+        forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get('REMOTE_ADDR', '')
+
+def post_email(request) -> str:
+    email = request.POST.get('email', '').strip().lower()
+    return hashlib.sha1(email.encode()).hexdigest() if email else ''
+
+def ratelimit(scope: str, rate_setting: str, keys=(client_ip, post_email), methods=('POST',)):
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if settings.RATELIMIT_ENABLED and request.method in methods:
+                limit, period = parse_rate(getattr(settings, rate_setting))
+                for key_func in keys:
+                    identity = key_func(request)
+                    if identity and not hit(f'{scope}:{key_func.__name__}:{identity}', limit, period):
+                        response = HttpResponse('Too many attempts. Please try again later.', status=429, content_type='text/plain')
+                        response['Retry-After'] = str(period)
+                        return response
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
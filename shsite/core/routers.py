@@ -0,0 +1,80 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+PRIMARY = 'default'
+PIN_COOKIE = 'primary_pin'
+
+# per request: whether reads may go to a replica, which replica was picked, and whether anything was written
+_state = ContextVar('replica_state', default=None)
+_down_until = {}
+
+def replica_aliases():
+    return [alias for alias in connections.databases if alias != PRIMARY]
+
+def _available(alias: str) -> bool:
+    if _down_until.get(alias, 0) > time.monotonic():
+        return False
+    try:
+        connections[alias].ensure_connection()
+    except DatabaseError:
+        _down_until[alias] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+        return False
+    return True
+
+def _pick_replica():
+    replicas = replica_aliases()
+    random.shuffle(replicas)
+    return next((alias for alias in replicas if _available(alias)), PRIMARY)
+
+@contextmanager
+def replica_reads(enabled: bool):
+    token = _state.set({'replica': enabled, 'alias': None, 'wrote': False})
+    try:
+        yield _state.get()
+    finally:
+        _state.reset(token)
+
+@contextmanager
+def use_primary():
+    state = _state.get()
+    if state is None or not state['replica']:
+        yield
+        return
+    state['replica'] = False
+    try:
+        yield
+    finally:
+        # a write inside the block must keep the rest of the request on the primary
+        if not state['wrote']:
+            state['replica'] = True
+
+class ReplicaRouter:
+    """
+    Sends reads to a replica while a ReplicaMiddleware request allows it; everything
+    else (writes, sessions, management commands, workers) uses the primary.
+    """
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state['replica'] or model._meta.app_label == 'sessions':
+            return PRIMARY
+        if state['alias'] is None:
+            state['alias'] = _pick_replica()
+        return state['alias']
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and model._meta.app_label != 'sessions':
+            # later reads in this request must see the write
+            state['replica'] = False
+            state['wrote'] = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
@@ -0,0 +1,124 @@
+import re
+from django.conf import settings
+from django.db import connections, router
+from .models import Category, ServiceProviderCategory
+
+FTS_TABLE = 'core_search_fts'
+
+PG_DOCUMENT = (
+    "setweight(to_tsvector('simple', coalesce(c.category_name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(p.name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(p.location, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(c.description, '')), 'C')"
+)
+
+# the FTS index keeps two- and three-letter prefixes (prefix='2 3'); a single letter matches most of it
+MIN_TOKEN_LENGTH = 2
+
+def _tokens(query: str):
+    return [token for token in re.findall(r'\w+', query.lower()) if len(token) >= MIN_TOKEN_LENGTH][:8]
+
+def _write_connection():
+    return connections[router.db_for_write(ServiceProviderCategory)]
+
+def _read_connection():
+    return connections[router.db_for_read(ServiceProviderCategory)]
+
+def create_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('CREATE INDEX IF NOT EXISTS core_category_search_gin ON core_serviceprovidercategory USING gin (search_vector)')
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                "category_name, description, provider_name, location, tokenize='unicode61', prefix='2 3')"
+            )
+
+def drop_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('DROP INDEX IF EXISTS core_category_search_gin')
+        elif connection.vendor == 'sqlite':
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+def _reindex(where: str = '', params=(), connection=None):
+    connection = connection or _write_connection()
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f'UPDATE core_serviceprovidercategory AS c SET search_vector = {PG_DOCUMENT} '
+                f'FROM core_serviceprovider AS p WHERE p.id = c.provider_id {where}',
+                params,
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid IN (SELECT c.id FROM core_serviceprovidercategory AS c WHERE 1=1 {where})',
+                params,
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, category_name, description, provider_name, location) '
+                'SELECT c.id, c.category_name, c.description, p.name, p.location '
+                f'FROM core_serviceprovidercategory AS c JOIN core_serviceprovider AS p ON p.id = c.provider_id WHERE 1=1 {where}',
+                params,
+            )
+
+def rebuild_index(connection=None):
+    connection = connection or _write_connection()
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    _reindex(connection=connection)
+
+def index_category(category_id: int):
+    _reindex('AND c.id = %s', [category_id])
+
+def index_provider(provider_id: int):
+    _reindex('AND c.provider_id = %s', [provider_id])
+
+def unindex_category(category_id: int):
+    connection = _write_connection()
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [category_id])
+
+def search_services(query: str, limit: int = 50):
+    qs = ServiceProviderCategory.objects.select_related('provider').only(
+        'id', 'category_name', 'description', 'rent_value', 'provider__id', 'provider__name', 'provider__location',
+    )
+    tokens = _tokens(query)
+    if not tokens:
+        # one-letter input: the categories whose name starts with it, read off the category index
+        prefix = query.strip()
+        if not prefix:
+            return []
+        categories = Category.objects.filter(name__istartswith=prefix).values('pk')
+        return list(qs.filter(category__in=categories).order_by('category', 'provider')[:limit])
+    connection = _read_connection()
+    candidates = settings.SEARCH_RANK_CANDIDATES
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+        tsquery = SearchQuery(' & '.join(f'{t}:*' for t in tokens), search_type='raw', config='simple')
+        matched = ServiceProviderCategory.objects.filter(search_vector=tsquery).values('pk')[:candidates]
+        return list(
+            qs.filter(pk__in=matched)
+            .annotate(rank=SearchRank('search_vector', tsquery))
+            .order_by('-rank', 'id')[:limit]
+        )
+    if connection.vendor == 'sqlite':
+        match = ' '.join(f'"{t}"*' for t in tokens)
+        with connection.cursor() as cursor:
+            # bm25 runs for the candidates only, not for every row a broad query matched
+            cursor.execute(
+                f'SELECT rowid FROM (SELECT rowid, bm25({FTS_TABLE}, 10.0, 1.0, 10.0, 5.0) AS score FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s LIMIT %s) ORDER BY score, rowid LIMIT %s',
+                [match, candidates, limit],
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        found = qs.in_bulk(ids)
+        return [found[pk] for pk in ids if pk in found]
+    from django.db.models import Q
+    for t in tokens:
+        qs = qs.filter(
+            Q(category_name__icontains=t) | Q(description__icontains=t) | Q(provider__name__icontains=t) | Q(provider__location__icontains=t)
+        )
+    return list(qs.order_by('category_name', 'id')[:limit])
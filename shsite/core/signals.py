@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from . import audit, caching, instrumentation, search, stats
+from .booking_states import booking_transitioned
+from .company import clear_company_info_cache
+from .email_policy import reload_policy
+from .middleware import app_user_cache_key
+from .models import AllowedEmailDomain, AppUser, CompanyInfo, ServiceProvider, ServiceProviderCategory
+
+@receiver([post_save, post_delete], sender=CompanyInfo)
+def company_info_changed(sender, **kwargs):
+    clear_company_info_cache()
+
+@receiver(pre_save, sender=ServiceProviderCategory)
+def remember_category_name(sender, instance, **kwargs):
+    instance._previous_category_name = None
+    if instance.pk:
+        instance._previous_category_name = ServiceProviderCategory.objects.filter(pk=instance.pk).values_list('category_name', flat=True).first()
+
+@receiver([post_save, post_delete], sender=ServiceProviderCategory)
+def category_stats_changed(sender, instance, **kwargs):
+    stats.refresh_category_stats(instance.category_name, getattr(instance, '_previous_category_name', None))
+
+@receiver(post_save, sender=ServiceProviderCategory)
+def category_saved(sender, instance, **kwargs):
+    search.index_category(instance.pk)
+
+@receiver(post_delete, sender=ServiceProviderCategory)
+def category_deleted(sender, instance, **kwargs):
+    search.unindex_category(instance.pk)
+
+@receiver(post_save, sender=ServiceProvider)
+def provider_saved(sender, instance, created, **kwargs):
+    if not created:
+        search.index_provider(instance.pk)
+
+@receiver([post_save, post_delete], sender=AppUser)
+def app_user_changed(sender, instance, **kwargs):
+    cache.delete(app_user_cache_key(instance.pk))
+
+@receiver([post_save, post_delete], sender=ServiceProvider)
+def provider_changed(sender, instance, **kwargs):
+    caching.invalidate_provider(instance.pk)
+
+@receiver([post_save, post_delete], sender=ServiceProviderCategory)
+def category_changed(sender, instance, **kwargs):
+    ServiceProvider.objects.filter(pk=instance.provider_id).update(updated_at=timezone.now())
+    caching.invalidate_provider(instance.provider_id)
+
+@receiver([post_save, post_delete], sender=AllowedEmailDomain)
+def email_domains_changed(sender, **kwargs):
+    reload_policy()
+
+@receiver(booking_transitioned)
+def audit_booking_transition(sender, transition, bookings, actor, app_user_id, **kwargs):
+    for pk, reference in bookings:
+        audit.record(actor, f'{transition} {reference}', app_user_id=app_user_id)
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    instrumentation.install(connection)
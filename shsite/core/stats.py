@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.db.models import Avg, Count, Max, Min
+from .models import ServiceCategoryStats, ServiceProviderCategory
+
+STATS_AGGREGATES = {
+    'provider_count': Count('id'),
+    'min_rent': Min('rent_value'),
+    'max_rent': Max('rent_value'),
+    'avg_rent': Avg('rent_value'),
+}
+
+def refresh_category_stats(*category_names):
+    # sorted, so two renames between the same categories lock their rows in the same order
+    for name in sorted(set(category_names) - {None}):
+        with transaction.atomic():
+            # concurrent saves in one category take turns on its stats row, so the last to write has seen every
+            # earlier save; min and max cannot be kept as deltas once a row is deleted, so recount the category
+            ServiceCategoryStats.objects.get_or_create(category_name=name)
+            row = ServiceCategoryStats.objects.select_for_update().get(category_name=name)
+            stats = ServiceProviderCategory.objects.filter(category_name=name).aggregate(**STATS_AGGREGATES)
+            if stats['provider_count']:
+                ServiceCategoryStats.objects.filter(pk=row.pk).update(**stats)
+            else:
+                row.delete()
+
+def rebuild_category_stats(category_model=ServiceProviderCategory, stats_model=ServiceCategoryStats):
+    rows = category_model.objects.values('category_name').annotate(**STATS_AGGREGATES).order_by()
+    with transaction.atomic():
+        stats_model.objects.all().delete()
+        stats_model.objects.bulk_create([stats_model(**row) for row in rows], batch_size=1000)
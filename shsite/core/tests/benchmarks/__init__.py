@@ -0,0 +1,92 @@
+"""
+Benchmarks for core. They are scripts rather than tests: run one from shsite/ with
+``python -m core.tests.benchmarks.<name>`` (``--help`` lists its options). Each builds a
+throwaway migrated database the way ``manage.py test`` does (on SQLite unless DATABASE_URL
+says otherwise), seeds it and prints what it measured.
+"""
+import os
+import random
+import statistics
+import time
+from contextlib import contextmanager
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'shsite.settings')
+    import django
+    django.setup()
+
+@contextmanager
+def test_database():
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+CATEGORY_NAMES = (
+    'Electrician', 'Plumber', 'Carpenter', 'AC Repair', 'Painter', 'Water Purifier', 'Pest Control', 'Cleaning',
+    'Appliance Repair', 'Mason', 'Welder', 'Tutor', 'Driver', 'Cook', 'Gardener', 'Tailor', 'Beautician',
+    'Photographer', 'Mechanic', 'Movers', 'Interior Design', 'Security Guard', 'Laundry', 'Locksmith',
+)
+# about one provider in 5,000 is a locksmith, the rest are spread evenly
+RARE_CATEGORY = 'Locksmith'
+CATEGORY_WEIGHTS = [0.005 if name == RARE_CATEGORY else 1.0 for name in CATEGORY_NAMES]
+LOCATIONS = ('Janjgir', 'Pamgarh', 'Champa', 'Bilaspur', 'Raipur', 'Korba', 'Durg', 'Bhilai', 'Raigarh', 'Akaltara')
+FIRST_NAMES = ('Rahul', 'Sita', 'Arjun', 'Priya', 'Vikram', 'Anita', 'Suresh', 'Kavita', 'Manoj', 'Deepa', 'Ravi', 'Meena')
+LAST_NAMES = ('Kumar', 'Devi', 'Verma', 'Sahu', 'Patel', 'Yadav', 'Sharma', 'Singh', 'Nishad', 'Chandra')
+DESCRIPTIONS = (
+    '{category} work for homes and offices',
+    'Experienced {category}, available on weekends',
+    'Same-day {category} visits around {location}',
+    'Licensed {category} with free estimates',
+    '{category} for apartments and shops, ten years in {location}',
+)
+
+def seed_providers(count: int, categories_per_provider: int = 1, start: int = 0, batch_size: int = 5000):
+    """
+    Bulk-create providers numbered start..start+count-1 with random (but repeatable) names, locations
+    and categories_per_provider categories each, then rebuild ServiceCategoryStats. Other signals do
+    not run, so rebuild the search index afterwards if a benchmark needs it.
+    """
+    from core.models import Category, ServiceProvider, ServiceProviderCategory
+    from core.stats import rebuild_category_stats
+    rng = random.Random(start)
+    categories = [Category.for_name(name) for name in CATEGORY_NAMES]
+    for offset in range(start, start + count, batch_size):
+        numbers = range(offset, min(offset + batch_size, start + count))
+        providers = ServiceProvider.objects.bulk_create([
+            ServiceProvider(
+                name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {n:07d}',
+                phone=f'9{n:09d}', password='!', location=rng.choice(LOCATIONS),
+            )
+            for n in numbers
+        ])
+        ServiceProviderCategory.objects.bulk_create([
+            ServiceProviderCategory(
+                provider=provider, category=category, category_name=category.name,
+                description=rng.choice(DESCRIPTIONS).format(category=category.name, location=provider.location),
+                rent_value=rng.randrange(100, 1000),
+            )
+            for provider in providers
+            for category in set(rng.choices(categories, CATEGORY_WEIGHTS, k=categories_per_provider))
+        ])
+    rebuild_category_stats()
+
+def timings(func, repeat: int) -> list:
+    """Seconds taken by each of repeat calls to func."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def summary(samples: list) -> str:
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return f'p50={statistics.median(samples) * 1000:.2f}ms p95={p95 * 1000:.2f}ms n={len(samples)}'
@@ -0,0 +1,88 @@
+"""
+Booking changelist in the admin over a large table, with EstimatedCountPaginator and with
+Django's own Paginator for comparison. Bookings are a minute apart counting back from now, so a
+million of them span about two years and the month the changelist opens on holds more rows than
+ADMIN_EXACT_COUNT_LIMIT; one in ten is pending. Pages past the count cap are fetched to show they
+stay reachable, and the last line follows the month's page links to its end.
+
+    python -m core.tests.benchmarks.admin_changelist --bookings 1000000 --repeat 5
+"""
+import argparse
+from . import setup, summary, test_database, timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bookings', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    setup()
+    with test_database() as connection:
+        from unittest import mock
+        from django.conf import settings
+        from django.contrib.auth.models import User
+        from django.core.paginator import Paginator
+        from django.test import Client, override_settings
+        from django.test.utils import CaptureQueriesContext
+        from django.urls import reverse
+        from django.utils import timezone
+        from core.admin import BookingAdmin
+        from core.models import Booking
+        from core.paginators import EstimatedCountPaginator
+        from core.tests.test_admin import STATIC_STORAGES
+        from core.tests.test_exports import seed_bookings
+        seed_bookings(args.bookings)
+        # seed_bookings gives every row the same time, which turns the newest-first ordering
+        # into one big tie for the id to break
+        if connection.vendor == 'postgresql':
+            spread = "booking_datetime = %s - id * interval '1 minute'"
+        else:
+            spread = "booking_datetime = datetime(%s, '-' || id || ' minutes')"
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE core_booking SET {spread}, status = CASE WHEN id %% 10 = 0 THEN 'pending' ELSE status END",
+                [connection.ops.adapt_datetimefield_value(timezone.now())],
+            )
+            cursor.execute('ANALYZE')
+        admin = User.objects.create_superuser('admin', 'admin@gmail.com', '!')
+        url = reverse('admin:core_booking_changelist')
+        today = timezone.localdate()
+        month = f'booking_datetime__year={today.year}&booking_datetime__month={today.month}'
+        in_month = Booking.objects.filter(booking_datetime__year=today.year, booking_datetime__month=today.month)
+        last_page = -(-in_month.count() // BookingAdmin.list_per_page)
+        views = (
+            ('month, page 1', f'{month}'),
+            ('month, page 3', f'{month}&p=3'),
+            ('month, last page', f'{month}&p={last_page}'),
+            ('pending, any date', 'status__exact=pending'),
+            ('search by ref', f'{month}&q=GS12345'),
+        )
+
+        def measure(client, query):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(f'{url}?{query}')
+            count = len(queries)
+            samples = timings(lambda: client.get(f'{url}?{query}'), args.repeat)
+            return response, f'status={response.status_code} queries={count} {summary(samples)}'
+
+        with override_settings(STORAGES=STATIC_STORAGES):
+            client = Client()
+            client.force_login(admin)
+            for label, paginator in (('EstimatedCountPaginator', EstimatedCountPaginator), ('Paginator', Paginator)):
+                print(f'{label} (ADMIN_EXACT_COUNT_LIMIT={settings.ADMIN_EXACT_COUNT_LIMIT:,})')
+                with mock.patch.object(BookingAdmin, 'paginator', paginator):
+                    for name, query in views:
+                        _, line = measure(client, query)
+                        print(f'  {name:17} {line}')
+            # follow the page links the way someone paging through would
+            page, seen = 1, 0
+            while True:
+                response = client.get(f'{url}?{month}&p={page}')
+                changelist = response.context['cl']
+                seen += len(changelist.result_list)
+                if page >= changelist.paginator.num_pages:
+                    break
+                page += 1
+            print(f'month walk: {page} pages, {seen:,} of {in_month.count():,} bookings reached')
+
+if __name__ == '__main__':
+    main()
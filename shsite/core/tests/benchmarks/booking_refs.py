@@ -0,0 +1,75 @@
+"""
+Bookings per second when several worker processes hire at once, with the counter-table
+allocator and with the prefix scan it replaced, which hands out duplicates under contention.
+
+    python -m core.tests.benchmarks.booking_refs --workers 8 --bookings 250
+"""
+import argparse
+import multiprocessing
+import time
+from . import setup, test_database
+
+def prefix_scan_ref():
+    # the generate_booking_ref that core.booking_refs replaced
+    from django.utils import timezone
+    from core.models import Booking
+    year = str(timezone.now().year)
+    last = Booking.objects.filter(booking_reference_id__startswith=f'GS{year}-').order_by('-id').first()
+    number = int(last.booking_reference_id.split('-')[1]) + 1 if last else 1
+    return f'GS{year}-{number:06d}'
+
+def worker(mode, count, user_id, provider_id, start, results):
+    from django.db import DatabaseError, IntegrityError, connections
+    from core.booking_refs import generate_booking_ref
+    from core.models import Booking
+    make_ref = generate_booking_ref if mode == 'allocator' else prefix_scan_ref
+    created = duplicates = errors = 0
+    start.wait()
+    for _ in range(count):
+        try:
+            Booking.objects.create(booking_reference_id=make_ref(), user_id=user_id, service_provider_id=provider_id, service_name='bench')
+            created += 1
+        except IntegrityError:
+            duplicates += 1
+        except DatabaseError:
+            errors += 1
+    connections.close_all()
+    results.put((created, duplicates, errors))
+
+def run(mode, workers, count, user_id, provider_id):
+    from django.db import connections
+    from core.models import Booking, BookingSequence
+    Booking.objects.all().delete()
+    BookingSequence.objects.all().delete()
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    start, results = context.Event(), context.Queue()
+    processes = [context.Process(target=worker, args=(mode, count, user_id, provider_id, start, results)) for _ in range(workers)]
+    for process in processes:
+        process.start()
+    started = time.perf_counter()
+    start.set()
+    totals = [sum(column) for column in zip(*(results.get() for _ in processes))]
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+    created, duplicates, errors = totals
+    unique = Booking.objects.values('booking_reference_id').distinct().count()
+    print(f'{mode:11} workers={workers} created={created} unique={unique} duplicate_refs={duplicates} '
+          f'db_errors={errors} bookings/s={created / elapsed:.0f}')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--bookings', type=int, default=250, help='Bookings created by each worker')
+    args = parser.parse_args()
+    setup()
+    with test_database():
+        from core.models import AppUser, ServiceProvider
+        user = AppUser.objects.create(name='bench', phone='1', email='bench@gmail.com', password='x')
+        provider = ServiceProvider.objects.create(name='bench', phone='2', password='x')
+        for mode in ('prefix-scan', 'allocator'):
+            run(mode, args.workers, args.bookings, user.pk, provider.pk)
+
+if __name__ == '__main__':
+    main()
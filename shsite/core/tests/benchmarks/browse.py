@@ -0,0 +1,49 @@
+"""
+browse_services latency as the directory grows to 100k providers: the first page, the last
+page (reached through the keyset cursor), a common and a rare category, and the location filter.
+
+    python -m core.tests.benchmarks.browse --sizes 1000,10000,100000
+"""
+import argparse
+from . import RARE_CATEGORY, seed_providers, setup, summary, test_database, timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Directory sizes to measure, in increasing order')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+    setup()
+    with test_database():
+        from django.conf import settings
+        from django.core import signing
+        from django.db import connection
+        from django.test import Client
+        from django.test.utils import CaptureQueriesContext
+        from django.urls import reverse
+        from core.models import ServiceProvider
+        client = Client()
+        url = reverse('browse_services')
+
+        def measure(label, params):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url, params)
+            assert response.status_code == 200, response.status_code
+            count = len(queries)
+            samples = timings(lambda: client.get(url, params), args.repeat)
+            print(f'  {label:20} queries={count} {summary(samples)}')
+
+        seeded = 0
+        for size in (int(size) for size in args.sizes.split(',')):
+            seed_providers(size - seeded, start=seeded)
+            seeded = size
+            print(f'{size} providers (page size {settings.BROWSE_PAGE_SIZE})')
+            last = ServiceProvider.objects.order_by('-name', '-id').values_list('name', 'id')[settings.BROWSE_PAGE_SIZE]
+            measure('first page', {})
+            measure('last page', {'after': signing.dumps(list(last), salt='browse_services')})
+            measure('common category', {'category': 'Plumber'})
+            measure('rare category', {'category': RARE_CATEGORY})
+            measure('location filter', {'location': 'Raipur'})
+            measure('both filters', {'category': 'Plumber', 'location': 'Raipur'})
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,33 @@
+"""
+Microseconds per email-domain check: the legacy endswith scan that views and forms each
+carried, against EmailDomainPolicy's set lookup, for the default allowlist and larger ones.
+
+    python -m core.tests.benchmarks.email_policy --sizes 23,1000,10000
+"""
+import argparse
+import timeit
+from . import setup
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='23,1000,10000', help='Allowlist sizes; the default list is padded with made-up domains')
+    parser.add_argument('--number', type=int, default=20000, help='Checks per measurement')
+    args = parser.parse_args()
+    setup()
+    from django.conf import settings
+    from core.email_policy import EmailDomainPolicy
+    from core.tests.test_email_policy import legacy_validate_email_domain
+    emails = ['asha@gmail.com', 'asha@zoho.com', 'asha@evil.gmail.com', 'asha@unlisted.example']
+    for size in (int(size) for size in args.sizes.split(',')):
+        domains = list(settings.ALLOWED_EMAIL_DOMAINS)
+        domains += [f'partner{n}.example' for n in range(size - len(domains))]
+        policy = EmailDomainPolicy(domains)
+        for email in emails:
+            assert policy.allows(email) == legacy_validate_email_domain(email, domains), email
+        legacy = timeit.timeit(lambda: [legacy_validate_email_domain(email, domains) for email in emails], number=args.number)
+        current = timeit.timeit(lambda: [policy.allows(email) for email in emails], number=args.number)
+        per_check = 1e6 / (args.number * len(emails))
+        print(f'{len(domains):6} domains  legacy={legacy * per_check:.2f}us  policy={current * per_check:.2f}us  x{legacy / current:.0f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+What InstrumentationMiddleware costs, checked against its 1% budget. Each page is served with
+the middleware, the timing template backend and the execute wrapper in place ("on") and with all
+three removed ("off"), alternating in rounds so drift hits both sides. A 1% difference is inside
+the noise of that A/B, so the budget is checked against the instrumentation's own cost: start(),
+one _execute() per query the page ran, the template timer, stop() and record(), timed in a loop
+around a no-op database call and divided by the page's median time with instrumentation off.
+Exits with status 1 when a page is over budget.
+
+    python -m core.tests.benchmarks.instrumentation --requests 200 --rounds 5
+"""
+import argparse
+import logging
+import statistics
+import sys
+import time
+from . import seed_providers, setup, test_database, timings
+
+BUDGET = 0.01
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--providers', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=200, help='Requests per page in each round')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--loops', type=int, default=20000, help='Iterations of the cost loop')
+    args = parser.parse_args()
+    setup()
+    with test_database() as connection:
+        from django.conf import settings
+        from django.http import HttpResponse
+        from django.test import Client, RequestFactory, override_settings
+        from django.test.utils import CaptureQueriesContext
+        from django.urls import resolve, reverse
+        from core import auth, instrumentation
+        from core.models import AppUser, Booking, CompanyInfo, ServiceProvider
+        # slow-request warnings would be timed along with everything else
+        logging.getLogger('core.instrumentation').setLevel(logging.CRITICAL)
+        seed_providers(args.providers, categories_per_provider=2)
+        CompanyInfo.objects.create()
+        user = AppUser.objects.create(name='Asha', phone='1', email='asha@gmail.com')
+        auth.set_password(user, 'correct horse')
+        Booking.objects.bulk_create([
+            Booking(booking_reference_id=f'GS2026-{n + 1:06d}', user=user, service_provider=provider, service_name='Plumber')
+            for n, provider in enumerate(ServiceProvider.objects.all()[:20])
+        ])
+        pages = {
+            'home': reverse('home'),
+            'browse_services': reverse('browse_services'),
+            'user_dashboard': reverse('user_dashboard'),
+        }
+        modes = {
+            'on': override_settings(RATELIMIT_ENABLED=False),
+            'off': override_settings(
+                RATELIMIT_ENABLED=False,
+                MIDDLEWARE=[path for path in settings.MIDDLEWARE if path != 'core.middleware.InstrumentationMiddleware'],
+                TEMPLATES=[{**settings.TEMPLATES[0], 'BACKEND': 'django.template.backends.django.DjangoTemplates'}],
+            ),
+        }
+        clients, samples, queries = {}, {}, {}
+        for mode, overrides in modes.items():
+            with overrides:
+                # a new Client builds its middleware chain on its first request
+                clients[mode] = Client()
+                response = clients[mode].post(reverse('login'), {'email': user.email, 'password': 'correct horse'})
+                assert response.status_code == 302, response.status_code
+        for round_ in range(args.rounds):
+            for mode, overrides in modes.items() if round_ % 2 == 0 else reversed(modes.items()):
+                with overrides:
+                    if mode == 'off':
+                        connection.execute_wrappers.remove(instrumentation._execute)
+                    try:
+                        for page, url in pages.items():
+                            client = clients[mode]
+                            with CaptureQueriesContext(connection) as captured:
+                                response = client.get(url)
+                            assert response.status_code == 200, (page, response.status_code)
+                            queries[page] = len(captured)
+                            samples.setdefault((page, mode), []).extend(timings(lambda: client.get(url), args.requests))
+                    finally:
+                        instrumentation.install(connection)
+
+        def noop(sql, params, many, context):
+            return None
+
+        def cost(request, query_count: int) -> float:
+            """Seconds the instrumentation adds to one request that ran query_count queries."""
+            def bare():
+                for _ in range(query_count):
+                    noop('SELECT 1', (), False, None)
+                return HttpResponse()
+
+            def instrumented():
+                state = instrumentation.start(request)
+                try:
+                    for _ in range(query_count):
+                        instrumentation._execute(noop, 'SELECT 1', (), False, None)
+                    with instrumentation.template_timer():
+                        response = HttpResponse()
+                finally:
+                    instrumentation.stop(state)
+                instrumentation.record(request, response, state)
+
+            runs = [sum(timings(func, args.loops)) / args.loops for _ in range(3) for func in (bare, instrumented)]
+            return min(runs[1::2]) - min(runs[::2])
+
+        over = False
+        print(f'{"page":16} {"queries":>7} {"off":>9} {"on":>9} {"A/B":>7} {"cost":>8} {"share":>7}')
+        for page, url in pages.items():
+            request = RequestFactory().get(url)
+            request.resolver_match = resolve(url)
+            off, on = statistics.median(samples[page, 'off']), statistics.median(samples[page, 'on'])
+            added = cost(request, queries[page])
+            share = added / off
+            over |= share > BUDGET
+            print(
+                f'{page:16} {queries[page]:7} {off * 1000:7.2f}ms {on * 1000:7.2f}ms {(on - off) / off:+7.1%} '
+                f'{added * 1e6:6.1f}us {share:7.2%}'
+            )
+        print(f'budget {BUDGET:.0%}: {"over" if over else "ok"}')
+        if over:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+"""
+Legitimate logins per second while attackers hammer the login view, with the rate limiter on
+and off. Each legitimate login comes from its own address and account; attackers guess
+passwords for one account from one address and stuff credentials across many accounts from
+another, each at up to --rate requests per second (without the limiter every guess costs a
+hash, so they fall well short). Each attacker runs in its own process, like a separate worker
+sharing the machine, so the attack competes for CPU rather than for this process's GIL.
+
+Phases: no attack, attack with the limiter, attack without it. Attackers start --warmup seconds
+early, so the few attempts each address is allowed per window are spent before legitimate
+logins are counted, as they would be a minute into a real attack.
+
+    python -m core.tests.benchmarks.login_attack --users 2 --attackers 4 --duration 10
+"""
+import argparse
+import itertools
+import logging
+import multiprocessing
+import threading
+import time
+from . import setup, test_database
+
+def attack(index: int, rate: float, stop: float, accounts: list, results):
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+    client = Client()
+    url = reverse('login')
+    attempts = rejected = 0
+    started = time.time()
+    for guess in itertools.count():
+        time.sleep(max(0.0, started + guess / rate - time.time()))
+        if time.time() >= stop:
+            break
+        # even attackers guess one account; odd ones stuff one password across every account
+        email = accounts[0] if index % 2 == 0 else accounts[guess % len(accounts)]
+        response = client.post(url, {'email': email, 'password': f'guess {guess}'}, REMOTE_ADDR=f'203.0.113.{index}')
+        attempts += 1
+        rejected += response.status_code == 429
+    connection.close()
+    results.put((attempts, rejected))
+
+def legitimate_logins(users: int, stop: float, accounts: list) -> int:
+    from django.db import connection
+    from django.test import Client
+    from django.urls import reverse
+    url = reverse('login')
+    lock = threading.Lock()
+    # every legitimate login is a different person, so none of them should ever reach a limit
+    queue = iter(enumerate(accounts))
+    logins = []
+
+    def login():
+        client = Client()
+        while time.time() < stop:
+            with lock:
+                number, email = next(queue)
+            response = client.post(url, {'email': email, 'password': 'correct horse'}, REMOTE_ADDR=f'10.{number >> 16 & 255}.{number >> 8 & 255}.{number & 255}')
+            logins.append(response.status_code == 302)
+        connection.close()
+
+    threads = [threading.Thread(target=login) for _ in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(logins)
+
+def run_phase(duration: float, warmup: float, users: int, attackers: int, rate: float, accounts: list) -> dict:
+    from django.db import connections
+    warmup = warmup if attackers else 0
+    stop = time.time() + warmup + duration
+    context = multiprocessing.get_context('fork')
+    results = context.Queue()
+    # children must open their own database connections
+    connections.close_all()
+    processes = [context.Process(target=attack, args=(index, rate, stop, accounts, results)) for index in range(attackers)]
+    for process in processes:
+        process.start()
+    time.sleep(warmup)
+    logins = legitimate_logins(users, stop, accounts)
+    totals = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    attempts = sum(attempts for attempts, _ in totals)
+    rejected = sum(rejected for _, rejected in totals)
+    return {'logins': logins / duration, 'attempts': attempts / (warmup + duration), 'rejected': rejected, 'hashed': attempts - rejected}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=2, help='Threads making legitimate logins')
+    parser.add_argument('--attackers', type=int, default=4, help='Attacking processes')
+    parser.add_argument('--rate', type=float, default=50.0, help='Requests per second each attacker aims for')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds legitimate logins are counted per phase')
+    parser.add_argument('--warmup', type=float, default=30.0, help='Seconds attackers run before legitimate logins start')
+    parser.add_argument('--accounts', type=int, default=5000, help='Accounts to seed; each legitimate login uses a fresh one')
+    args = parser.parse_args()
+    setup()
+    # every hashed login is a slow request and every rejection a 429; the warnings would bury the results
+    for name in ('core.instrumentation', 'django.request'):
+        logging.getLogger(name).setLevel(logging.ERROR)
+    with test_database():
+        from django.contrib.auth.hashers import make_password
+        from django.core.cache import cache
+        from django.test import override_settings
+        from core.models import AppUser
+        # one hash shared by every account keeps seeding fast; each login still verifies it in full
+        password = make_password('correct horse')
+        AppUser.objects.bulk_create([
+            AppUser(name=f'User {n}', phone=str(n), email=f'user{n}@gmail.com', password=password)
+            for n in range(args.accounts)
+        ])
+        accounts = [f'user{n}@gmail.com' for n in range(args.accounts)]
+        phases = {
+            'no attack': (0, True),
+            'attack, limiter on': (args.attackers, True),
+            'attack, limiter off': (args.attackers, False),
+        }
+        baseline = None
+        for label, (attackers, enabled) in phases.items():
+            cache.clear()
+            with override_settings(RATELIMIT_ENABLED=enabled):
+                result = run_phase(args.duration, args.warmup, args.users, attackers, args.rate, accounts)
+            baseline = baseline or result['logins']
+            print(
+                f'{label:20} legitimate={result["logins"]:.1f}/s ({result["logins"] / baseline:.0%} of no attack) '
+                f'attack={result["attempts"]:.0f}/s rejected={result["rejected"]:.0f} hashed={result["hashed"]:.0f}'
+            )
+
+if __name__ == '__main__':
+    main()
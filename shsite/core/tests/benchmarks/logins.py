@@ -0,0 +1,67 @@
+"""
+Logins per second on one core for each available password hasher: a correct password, a wrong
+one and an unknown email through core.auth.authenticate, and a correct password through the
+login view (rate limiting off). A single thread keeps one core busy, so the rates are per core.
+
+    python -m core.tests.benchmarks.logins --logins 50
+"""
+import argparse
+import importlib
+import time
+from . import setup, test_database
+
+HASHERS = (
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+)
+
+def available(path: str) -> bool:
+    module, name = path.rsplit('.', 1)
+    hasher = getattr(importlib.import_module(module), name)()
+    if not hasher.library:
+        return True
+    try:
+        hasher._load_library()
+    except ValueError:
+        return False
+    return True
+
+def rate(func, count: int) -> float:
+    started = time.perf_counter()
+    for _ in range(count):
+        func()
+    return count / (time.perf_counter() - started)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=50, help='Logins per hasher and case')
+    args = parser.parse_args()
+    setup()
+    with test_database():
+        from django.contrib.auth.hashers import make_password
+        from django.test import Client, override_settings
+        from django.urls import reverse
+        from core import auth
+        from core.models import AppUser
+        client = Client()
+        for path in HASHERS:
+            name = path.rsplit('.', 1)[1]
+            if not available(path):
+                print(f'{name:28} skipped, library not installed')
+                continue
+            with override_settings(PASSWORD_HASHERS=[path], RATELIMIT_ENABLED=False):
+                user = AppUser.objects.create(name='Bench', phone='1', email=f'{name.lower()}@gmail.com', password=make_password('correct horse'))
+                assert auth.authenticate(user.email, 'correct horse') == user
+                results = {
+                    'correct': rate(lambda: auth.authenticate(user.email, 'correct horse'), args.logins),
+                    'wrong': rate(lambda: auth.authenticate(user.email, 'wrong horse'), args.logins),
+                    'unknown email': rate(lambda: auth.authenticate('nobody@gmail.com', 'correct horse'), args.logins),
+                    'login view': rate(lambda: client.post(reverse('login'), {'email': user.email, 'password': 'correct horse'}), args.logins),
+                }
+            print(f'{name:28} ' + ' '.join(f'{case}={value:.0f}/s' for case, value in results.items()))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Requests per second for the cached public pages (home, browse_services, provider_detail)
+with caching turned off (DummyCache) and on (the default local-memory cache).
+
+    python -m core.tests.benchmarks.public_pages --providers 1000 --requests 500
+"""
+import argparse
+import time
+from . import seed_providers, setup, test_database
+
+CACHE_MODES = {
+    'no cache': 'django.core.cache.backends.dummy.DummyCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--providers', type=int, default=1000)
+    parser.add_argument('--requests', type=int, default=500, help='Requests per page and mode')
+    args = parser.parse_args()
+    setup()
+    with test_database() as connection:
+        from django.test import Client, override_settings
+        from django.test.utils import CaptureQueriesContext
+        from django.urls import reverse
+        from core.models import CompanyInfo, ServiceProvider
+        seed_providers(args.providers, categories_per_provider=2)
+        CompanyInfo.objects.create()
+        pages = {
+            'home': reverse('home'),
+            'browse_services': reverse('browse_services'),
+            'provider_detail': reverse('provider_detail', args=[ServiceProvider.objects.order_by('name').first().pk]),
+        }
+        client = Client()
+        results = {}
+        for mode, backend in CACHE_MODES.items():
+            with override_settings(CACHES={'default': {'BACKEND': backend}}):
+                for page, url in pages.items():
+                    client.get(url)
+                    with CaptureQueriesContext(connection) as queries:
+                        client.get(url)
+                    count = len(queries)
+                    started = time.perf_counter()
+                    for _ in range(args.requests):
+                        client.get(url)
+                    results[page, mode] = args.requests / (time.perf_counter() - started)
+                    print(f'{page:16} {mode:9} queries={count} {results[page, mode]:.0f} req/s')
+        for page in pages:
+            print(f'{page:16} speedup x{results[page, "locmem"] / results[page, "no cache"]:.2f}')
+
+if __name__ == '__main__':
+    main()
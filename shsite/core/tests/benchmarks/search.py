@@ -0,0 +1,50 @@
+"""
+/search latency over 100k indexed service categories, for whole words, prefixes, several
+terms, provider names and locations, and for the one- and two-letter and stopword-like queries
+that match most of the index. The target is p95 under 50 ms.
+
+    python -m core.tests.benchmarks.search --categories 100000
+"""
+import argparse
+from . import seed_providers, setup, summary, test_database, timings
+
+QUERIES = {
+    'word': ['plumber', 'electrician', 'carpenter', 'tailor'],
+    'prefix': ['plu', 'elec', 'carp', 'pho'],
+    'several terms': ['plumber raipur', 'ac repair korba', 'licensed electrician', 'cook weekends durg'],
+    'provider name': ['rahul', 'sita verma', 'priya sahu'],
+    'location': ['janjgir', 'bilaspur', 'champa'],
+    'broad': ['experienced', 'homes offices', 'same day'],
+    'one letter': ['a', 's', 'e', 'p'],
+    'two letters': ['ac', 'pl', 'se', 'in'],
+    'stopword-like': ['for', 'and', 'with', 'on', 'in the'],
+    'no match': ['zzz', 'helicopter'],
+}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--categories', type=int, default=100000, help='Indexed categories (two per provider)')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs of each query')
+    args = parser.parse_args()
+    setup()
+    with test_database() as connection:
+        from django.test import Client
+        from django.urls import reverse
+        from core import search
+        from core.models import ServiceProviderCategory
+        seed_providers(args.categories // 2, categories_per_provider=2)
+        search.rebuild_index(connection)
+        print(f'{ServiceProviderCategory.objects.count()} categories indexed on {connection.vendor}')
+        client = Client()
+        everything = []
+        for kind, queries in QUERIES.items():
+            samples = []
+            for query in queries:
+                assert client.get(reverse('search'), {'q': query}).status_code == 200
+                samples += timings(lambda: client.get(reverse('search'), {'q': query}), args.repeat)
+            everything += samples
+            print(f'  {kind:14} {summary(samples)}')
+        print(f'  {"all":14} {summary(everything)}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Queries and latency per request on the logged-in views for each SESSION_BACKEND. Every mode
+logs in through the login view, so the session is written the way production writes it; the
+django_session queries are counted separately, and logout shows what a session write costs.
+
+    python -m core.tests.benchmarks.sessions --bookings 20 --repeat 300
+"""
+import argparse
+from . import seed_providers, setup, summary, test_database, timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bookings', type=int, default=20, help='Bookings shown on the dashboard')
+    parser.add_argument('--repeat', type=int, default=300)
+    args = parser.parse_args()
+    setup()
+    with test_database() as connection:
+        from django.conf import settings
+        from django.core.cache import cache
+        from django.test import Client, override_settings
+        from django.test.utils import CaptureQueriesContext
+        from django.urls import reverse
+        from core import auth
+        from core.models import AppUser, Booking, ServiceProvider
+        seed_providers(args.bookings)
+        user = AppUser.objects.create(name='Asha', phone='1', email='asha@gmail.com')
+        auth.set_password(user, 'correct horse')
+        Booking.objects.bulk_create([
+            Booking(booking_reference_id=f'GS2026-{n + 1:06d}', user=user, service_provider=provider, service_name='Plumber')
+            for n, provider in enumerate(ServiceProvider.objects.all())
+        ])
+
+        def measure(client, label, url):
+            with CaptureQueriesContext(connection) as queries:
+                response = client.get(url)
+            sql = [query['sql'] for query in queries]
+            sessions = sum('django_session' in statement for statement in sql)
+            return response, f'{label:15} queries={len(sql)} session={sessions}'
+
+        for mode, engine in settings.SESSION_ENGINES.items():
+            cache.clear()
+            # a new Client builds a new handler, so SessionMiddleware picks up the engine
+            with override_settings(SESSION_ENGINE=engine, RATELIMIT_ENABLED=False):
+                client = Client()
+                response = client.post(reverse('login'), {'email': user.email, 'password': 'correct horse'})
+                assert response.status_code == 302, response.status_code
+                print(mode)
+                for label, name in (('user_dashboard', 'user_dashboard'), ('edit_profile', 'edit_profile')):
+                    url = reverse(name)
+                    client.get(url)
+                    response, line = measure(client, label, url)
+                    assert response.status_code == 200, response.status_code
+                    print(f'  {line} {summary(timings(lambda: client.get(url), args.repeat))}')
+                _, line = measure(client, 'logout', reverse('logout'))
+                print(f'  {line}')
+
+if __name__ == '__main__':
+    main()
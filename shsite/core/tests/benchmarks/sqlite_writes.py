@@ -0,0 +1,84 @@
+"""
+Concurrent SQLite writers under three connection setups: the stock backend (rollback journal,
+full sync, 5 s busy timeout, deferred transactions), WAL with the SQLITE_PRAGMAS but deferred
+transactions, and the defaults (WAL, pragmas, BEGIN IMMEDIATE). Processes insert mail rows,
+read-then-update a provider inside atomic(), or read a page of providers, all at once;
+"locked" counts operations that failed with "database is locked".
+
+    python -m core.tests.benchmarks.sqlite_writes --operations 150
+"""
+import argparse
+import multiprocessing
+import time
+from . import seed_providers, setup, summary, test_database
+
+MODES = {
+    'stock': {'timeout': 5, 'transaction_mode': None, 'init_command': 'PRAGMA journal_mode = delete; PRAGMA synchronous = full'},
+    'wal, deferred': {'transaction_mode': None},
+    'wal, immediate': {},
+}
+ROLES = ['insert'] * 4 + ['read-modify-write'] * 2 + ['read'] * 2
+
+def work(role: str, operations: int, results):
+    from django.db import OperationalError, connection, transaction
+    from core.models import OutboundEmail, ServiceProvider
+    samples, locked = [], 0
+    try:
+        pks = list(ServiceProvider.objects.values_list('pk', flat=True)[:100])
+        for n in range(operations):
+            started = time.perf_counter()
+            try:
+                if role == 'insert':
+                    OutboundEmail.objects.create(subject='Benchmark', body='b' * 200, from_email='noreply@local', to='a@gmail.com')
+                elif role == 'read-modify-write':
+                    with transaction.atomic():
+                        provider = ServiceProvider.objects.get(pk=pks[n % len(pks)])
+                        ServiceProvider.objects.filter(pk=provider.pk).update(phone=str(n))
+                else:
+                    list(ServiceProvider.objects.order_by('name')[:50])
+            except OperationalError:
+                locked += 1
+                continue
+            samples.append(time.perf_counter() - started)
+    finally:
+        connection.close()
+        # report even after a crash, or the parent waits forever
+        results.put((role, samples, locked))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--operations', type=int, default=150, help='Operations per process')
+    args = parser.parse_args()
+    setup()
+    with test_database() as connection:
+        from django.db import connections
+        if connection.vendor != 'sqlite':
+            raise SystemExit(f'This benchmark measures SQLite; DATABASE_URL points at {connection.vendor}')
+        seed_providers(1000)
+        defaults = connection.settings_dict['OPTIONS']
+        context = multiprocessing.get_context('fork')
+        for mode, options in MODES.items():
+            # the journal mode belongs to the file and only changes with no one else connected,
+            # so switch it here; the forked children inherit these options
+            connections.close_all()
+            connection.settings_dict['OPTIONS'] = {**defaults, **options}
+            connection.ensure_connection()
+            connections.close_all()
+            results = context.Queue()
+            processes = [context.Process(target=work, args=(role, args.operations, results)) for role in ROLES]
+            started = time.perf_counter()
+            for process in processes:
+                process.start()
+            outcomes = [results.get() for _ in processes]
+            for process in processes:
+                process.join()
+            print(f'{mode} ({time.perf_counter() - started:.1f}s wall)')
+            for role in dict.fromkeys(ROLES):
+                samples = [sample for name, found, _ in outcomes if name == role for sample in found]
+                locked = sum(count for name, _, count in outcomes if name == role)
+                print(f'  {role:18} locked={locked:<4} {summary(samples) if samples else "no successes"}')
+        connections.close_all()
+        connection.settings_dict['OPTIONS'] = defaults
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+Throughput and latency of the public pages under each way of serving the app: gunicorn's sync
+and gthread workers (WSGI) and the uvicorn worker (ASGI), each with one worker process, and the
+same pages as async views under ASGI and WSGI. Concurrent clients request home, browse_services,
+a category, a search and a provider page in turn, cycling through every provider so most provider
+pages miss the cache; every query sleeps --query-delay-ms first to stand in for the round trip to
+PostgreSQL, since SQLite answers from the same machine.
+
+The async views are the sync ones behind sync_to_async, which is how Django 5.0 runs each async
+ORM call. A hand-ported view makes one such hop per query rather than one per request, so these
+rows are the least an async version costs. The table in RENDER_DEPLOYMENT.md comes from
+
+    python -m core.tests.benchmarks.wsgi_asgi --query-delay-ms 3
+    python -m core.tests.benchmarks.wsgi_asgi --query-delay-ms 20
+"""
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from . import seed_providers, setup, test_database
+
+# name: (gunicorn worker arguments, interface, async views)
+MODES = {
+    'WSGI, sync worker': (['--worker-class', 'sync'], 'wsgi', False),
+    'WSGI, gthread worker, 8 threads': (['--worker-class', 'gthread', '--threads', '8'], 'wsgi', False),
+    'ASGI, uvicorn worker': (['--worker-class', 'uvicorn_worker.UvicornWorker'], 'asgi', False),
+    'ASGI, uvicorn worker, async views': (['--worker-class', 'uvicorn_worker.UvicornWorker'], 'asgi', True),
+    'WSGI, sync worker, async views': (['--worker-class', 'sync'], 'wsgi', True),
+}
+ASYNC_VIEWS = ('home', 'browse_services', 'search', 'provider_detail')
+
+def _asynchronous(view):
+    from asgiref.sync import sync_to_async
+    view = sync_to_async(view)
+
+    async def asynchronous_view(request, *args, **kwargs):
+        return await view(request, *args, **kwargs)
+    return asynchronous_view
+
+def served(interface: str, async_views: bool = False, query_delay_ms: float = 0.0):
+    """gunicorn app factory: the project's WSGI or ASGI application with the benchmark's changes applied."""
+    global urlpatterns
+    setup()
+    from django.conf import settings
+    from django.db.backends.signals import connection_created
+    from django.urls import path
+    from core import urls
+    settings.ALLOWED_HOSTS = ['*']
+    settings.SECURE_SSL_REDIRECT = False
+    # the manifest storage needs collectstatic to have run
+    settings.STORAGES = {**settings.STORAGES, 'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}}
+
+    def delayed(execute, sql, params, many, context):
+        time.sleep(query_delay_ms / 1000)
+        return execute(sql, params, many, context)
+
+    def add_delay(sender, connection, **kwargs):
+        connection.execute_wrappers.insert(0, delayed)
+
+    if query_delay_ms:
+        connection_created.connect(add_delay, weak=False)
+    if async_views:
+        urlpatterns = [
+            path(str(pattern.pattern), _asynchronous(pattern.callback), name=pattern.name) if pattern.name in ASYNC_VIEWS else pattern
+            for pattern in urls.urlpatterns
+        ]
+        settings.ROOT_URLCONF = __name__
+    if interface == 'asgi':
+        from django.core.asgi import get_asgi_application
+        return get_asgi_application()
+    from django.core.wsgi import get_wsgi_application
+    return get_wsgi_application()
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+def wait_for(port: int, server: subprocess.Popen, log, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            log.seek(0)
+            raise SystemExit(f'{log.read()[-3000:]}\ngunicorn exited with status {server.returncode}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit(f'gunicorn did not listen on {port} within {timeout:.0f}s')
+
+def load(port: int, paths: list, clients: int, seconds: float) -> tuple:
+    """Requests per second and per-request latencies with clients looping over paths for seconds."""
+    latencies, errors = [], []
+    stop = threading.Event()
+
+    def client(offset: int):
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        n = offset
+        while not stop.is_set():
+            path = paths[n % len(paths)]
+            n += 1
+            started = time.perf_counter()
+            try:
+                connection.request('GET', path)
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException) as exc:
+                errors.append(exc)
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            if response.status != 200:
+                errors.append(f'{path}: {response.status}')
+            latencies.append(time.perf_counter() - started)
+        connection.close()
+
+    threads = [threading.Thread(target=client, args=(n * 7,)) for n in range(clients)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return len(latencies) / (time.perf_counter() - started), latencies, errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--providers', type=int, default=1000)
+    parser.add_argument('--clients', type=int, default=20)
+    parser.add_argument('--seconds', type=float, default=20, help='Measured load per mode, after a warmup of a quarter of it')
+    parser.add_argument('--query-delay-ms', type=float, default=3.0)
+    parser.add_argument('--mode', action='append', choices=MODES, help='Run only these modes (repeatable)')
+    args = parser.parse_args()
+    setup()
+    with test_database() as connection:
+        from django.db import connections
+        from django.urls import reverse
+        from core import search
+        from core.models import CompanyInfo, ServiceProvider
+        seed_providers(args.providers, categories_per_provider=2)
+        search.rebuild_index(connection)
+        CompanyInfo.objects.create()
+        pages = [reverse('home'), reverse('browse_services'), f'{reverse("browse_services")}?category=Plumber', f'{reverse("search")}?q=plumber']
+        paths = [
+            path
+            for pk in ServiceProvider.objects.order_by('?').values_list('pk', flat=True)
+            for path in (*pages, reverse('provider_detail', args=[pk]))
+        ]
+        database = Path(connection.settings_dict['NAME']).resolve()
+        # the servers open the file themselves; WAL lets them read while nothing here holds it
+        connections.close_all()
+        environment = {**os.environ, 'DATABASE_URL': f'sqlite:///{database}', 'DEBUG': 'False', 'LOG_LEVEL': 'ERROR'}
+        print(f'{args.clients} clients, {args.query_delay_ms:g} ms per query, one worker, {os.cpu_count()} CPUs')
+        print(f'  {"mode":36} {"req/s":>7} {"p50":>8} {"p95":>8}')
+        for mode in args.mode or MODES:
+            worker, interface, async_views = MODES[mode]
+            port = free_port()
+            factory = f'{__spec__.name}:served({interface!r}, async_views={async_views}, query_delay_ms={args.query_delay_ms})'
+            with tempfile.TemporaryFile(mode='w+') as log:
+                server = subprocess.Popen(
+                    [sys.executable, '-m', 'gunicorn', '--workers', '1', *worker, '--bind', f'127.0.0.1:{port}', factory],
+                    env=environment, stdout=log, stderr=subprocess.STDOUT,
+                )
+                try:
+                    wait_for(port, server, log)
+                    load(port, paths, args.clients, args.seconds / 4)
+                    rate, latencies, errors = load(port, paths, args.clients, args.seconds)
+                finally:
+                    server.terminate()
+                    server.wait()
+            p50 = statistics.median(latencies)
+            p95 = sorted(latencies)[int(len(latencies) * 0.95)]
+            print(f'  {mode:36} {rate:7.0f} {p50 * 1000:6.0f}ms {p95 * 1000:6.0f}ms' + (f'  errors={len(errors)}: {errors[0]}' if errors else ''))
+
+if __name__ == '__main__':
+    main()
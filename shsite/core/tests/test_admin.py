@@ -0,0 +1,126 @@
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from core.models import AppUser, Booking, ServiceProvider
+
+def add_bookings(count: int, status: str, start: int = 0):
+    user = AppUser.objects.get_or_create(email='asha@gmail.com', defaults={'name': 'Asha', 'phone': '1', 'password': 'x'})[0]
+    provider = ServiceProvider.objects.get_or_create(name='Provider', defaults={'phone': '1', 'password': 'x'})[0]
+    Booking.objects.bulk_create([
+        Booking(booking_reference_id=f'GS2026-{n:06d}', user=user, service_provider=provider, service_name='Plumber', status=status)
+        for n in range(start, start + count)
+    ])
+
+# the manifest storage needs collectstatic to have run
+STATIC_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+@override_settings(ADMIN_EXACT_COUNT_LIMIT=120, STORAGES=STATIC_STORAGES)
+class BookingChangelistPaginationTests(TestCase):
+    """The booking changelist shows 100 rows a page; the limit of 120 caps its counts."""
+    @classmethod
+    def setUpTestData(cls):
+        add_bookings(301, 'pending')
+        add_bookings(20, 'completed', start=301)
+        cls.admin = User.objects.create_superuser('admin', 'admin@gmail.com', 'x')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:core_booking_changelist')
+
+    def changelist(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200, response.get('Location'))
+        return response
+
+    def test_pages_past_a_capped_filter_count_stay_reachable(self):
+        found = []
+        for page in (1, 2, 3, 4):
+            response = self.changelist(status__exact='pending', p=page)
+            found += [booking.pk for booking in response.context['cl'].result_list]
+        self.assertEqual(sorted(found), sorted(Booking.objects.filter(status='pending').values_list('pk', flat=True)))
+        self.assertEqual(len(found), 301)
+
+    def test_page_links_follow_what_the_page_found(self):
+        response = self.changelist(status__exact='pending', p=3)
+        self.assertEqual(response.context['cl'].paginator.num_pages, 4)
+        self.assertContains(response, 'p=4')
+        response = self.changelist(status__exact='pending', p=4)
+        self.assertEqual(response.context['cl'].paginator.num_pages, 4)
+        self.assertNotContains(response, 'p=5')
+
+    def test_a_page_past_the_last_row_is_rejected(self):
+        response = self.client.get(self.url, {'status__exact': 'pending', 'p': 5})
+        self.assertRedirects(response, f'{self.url}?e=1', fetch_redirect_response=False)
+
+    def test_capped_count_is_shown_as_a_lower_bound(self):
+        response = self.changelist(status__exact='pending')
+        self.assertContains(response, 'more than 120 bookings')
+        self.assertContains(response, 'Select all more than 120 bookings')
+        self.assertContains(response, 'All more than 120 selected')
+        self.assertContains(response, 'more than 120 results')
+        for capped in ('121 bookings', '121 results', 'All 121 selected'):
+            self.assertNotContains(response, capped)
+
+    def test_counts_under_the_limit_stay_exact(self):
+        response = self.changelist(status__exact='completed')
+        self.assertTrue(response.context['cl'].paginator.count_is_exact)
+        self.assertContains(response, '20 bookings')
+
+    def test_unfiltered_list_shows_the_estimate_and_ends_where_the_rows_do(self):
+        # deleted rows leave the highest id, and so the estimate, above the real total
+        Booking.objects.filter(status='completed').delete()
+        add_bookings(100, 'completed', start=400)
+        Booking.objects.filter(booking_reference_id__gte='GS2026-000400', booking_reference_id__lt='GS2026-000450').delete()
+        response = self.changelist(p=1)
+        self.assertContains(response, f'about {Booking.objects.order_by("-pk").first().pk} bookings')
+        response = self.changelist(p=4)
+        self.assertEqual(len(response.context['cl'].result_list), 51)
+        self.assertEqual(response.context['cl'].paginator.num_pages, 4)
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class AuditedDeleteTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        add_bookings(30, 'pending')
+        cls.admin = User.objects.create_superuser('admin', 'admin@gmail.com', 'x')
+
+    def test_deleting_a_selection_records_one_summary_entry(self):
+        self.client.force_login(self.admin)
+        selected = list(Booking.objects.order_by('pk').values_list('pk', flat=True)[5:25])
+        with mock.patch('core.audit.record_admin') as record_admin:
+            response = self.client.post(
+                reverse('admin:core_booking_changelist'),
+                {'action': 'delete_selected', '_selected_action': selected, 'post': 'yes'},
+            )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Booking.objects.count(), 10)
+        record_admin.assert_called_once_with(mock.ANY, f'deleted 20 booking rows with ids {selected[0]} to {selected[-1]}')
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class BookingStatusTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        add_bookings(1, 'completed')
+        cls.admin = User.objects.create_superuser('admin', 'admin@gmail.com', 'x')
+
+    def test_the_change_form_cannot_move_a_booking_out_of_a_final_state(self):
+        self.client.force_login(self.admin)
+        booking = Booking.objects.get()
+        when = timezone.localtime(booking.booking_datetime)
+        response = self.client.post(reverse('admin:core_booking_change', args=[booking.pk]), {
+            'booking_reference_id': booking.booking_reference_id,
+            'user': booking.user_id,
+            'service_provider': booking.service_provider_id,
+            'service_name': 'Electrician',
+            'booking_datetime_0': when.strftime('%Y-%m-%d'),
+            'booking_datetime_1': when.strftime('%H:%M:%S'),
+            'status': 'pending',
+        })
+        self.assertEqual(response.status_code, 302)
+        booking.refresh_from_db()
+        self.assertEqual((booking.service_name, booking.status), ('Electrician', 'completed'))
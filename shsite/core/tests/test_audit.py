@@ -0,0 +1,92 @@
+import os
+import subprocess
+import sys
+from datetime import timedelta
+from io import StringIO
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from core import audit
+from core.models import AuditLog, AuditLogArchive
+
+def pending_timer():
+    with audit._lock:
+        return audit._timer
+
+def wait_for_flush():
+    timer = pending_timer()
+    if timer is not None:
+        timer.join(timeout=5)
+    # a timer that has started flushing has already dropped itself, and holds the write lock until it is done
+    with audit._write_lock:
+        pass
+
+@override_settings(AUDIT_BUFFER_SIZE=3, AUDIT_FLUSH_SECONDS=60)
+class BufferedAuditTests(TransactionTestCase):
+    """The timer thread writes on its own connection, so the rows have to be committed."""
+    def tearDown(self):
+        audit.flush()
+
+    def test_entries_wait_for_the_timer(self):
+        audit.record('admin', 'first')
+        audit.record('admin', 'second')
+        self.assertEqual(AuditLog.objects.count(), 0)
+        self.assertEqual(pending_timer().interval, 60)
+
+    def test_a_full_buffer_is_written_straight_away(self):
+        for n in range(3):
+            audit.record('admin', f'entry {n}')
+        wait_for_flush()
+        self.assertEqual(sorted(AuditLog.objects.values_list('action', flat=True)), ['entry 0', 'entry 1', 'entry 2'])
+        self.assertIsNone(pending_timer())
+
+    @override_settings(AUDIT_FLUSH_SECONDS=0.05)
+    def test_the_timer_writes_what_is_waiting(self):
+        audit.record('admin', 'changed booking #1', app_user_id=None)
+        wait_for_flush()
+        entry = AuditLog.objects.get()
+        self.assertEqual((entry.actor, entry.action), ('admin', 'changed booking #1'))
+        self.assertIsNone(pending_timer())
+
+    def test_entries_are_queued_only_when_the_transaction_commits(self):
+        with transaction.atomic():
+            audit.record('admin', 'kept')
+            self.assertEqual(audit._buffer, [])
+        try:
+            with transaction.atomic():
+                audit.record('admin', 'rolled back')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual([entry.action for entry in audit._buffer], ['kept'])
+
+    def test_what_is_waiting_is_written_when_the_process_exits(self):
+        # a separate interpreter, so the flush registered with atexit is the only thing that can write the entry
+        environment = {**os.environ, 'DATABASE_URL': f'sqlite:///{connection.settings_dict["NAME"]}', 'AUDIT_FLUSH_SECONDS': '60'}
+        subprocess.run(
+            [sys.executable, 'manage.py', 'shell', '-c', "from core import audit; audit.record('admin', 'queued at exit')"],
+            cwd=settings.BASE_DIR, env=environment, check=True, capture_output=True,
+        )
+        self.assertEqual(list(AuditLog.objects.values_list('action', flat=True)), ['queued at exit'])
+
+class ArchiveAuditLogTests(TestCase):
+    def test_entries_past_retention_move_to_the_archive_in_chunks(self):
+        now = timezone.now()
+        old = AuditLog.objects.bulk_create([
+            AuditLog(actor='admin', action=f'old {n}', timestamp=now - timedelta(days=91 + n)) for n in range(5)
+        ])
+        AuditLog.objects.create(actor='admin', action='recent', timestamp=now - timedelta(days=89))
+        out = StringIO()
+        call_command('archive_audit_log', '--chunk-size', '2', stdout=out)
+        self.assertIn('Archived 5 audit entries', out.getvalue())
+        self.assertEqual(list(AuditLog.objects.values_list('action', flat=True)), ['recent'])
+        archived = AuditLogArchive.objects.order_by('id')
+        self.assertEqual([(entry.id, entry.action) for entry in archived], [(entry.id, entry.action) for entry in old])
+
+    def test_days_overrides_the_retention_setting(self):
+        AuditLog.objects.create(actor='admin', action='last week', timestamp=timezone.now() - timedelta(days=7))
+        call_command('archive_audit_log', '--days', '5', stdout=StringIO())
+        self.assertEqual(AuditLogArchive.objects.get().action, 'last week')
+        self.assertFalse(AuditLog.objects.exists())
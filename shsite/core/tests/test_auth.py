@@ -0,0 +1,21 @@
+from unittest import mock
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase
+from core import auth
+from core.models import AppUser
+
+class AuthenticateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = AppUser.objects.create(name='Asha', phone='1', email='asha@gmail.com', password=make_password('correct horse'))
+
+    def test_correct_and_wrong_passwords(self):
+        self.assertEqual(auth.authenticate('asha@gmail.com', 'correct horse'), self.user)
+        self.assertIsNone(auth.authenticate('asha@gmail.com', 'wrong horse'))
+
+    def test_unknown_email_and_unusable_password_still_hash(self):
+        AppUser.objects.create(name='Ravi', phone='2', email='ravi@gmail.com', password='!')
+        for email in ('nobody@gmail.com', 'ravi@gmail.com'):
+            with self.subTest(email=email), mock.patch('core.auth.make_password', wraps=make_password) as hashed:
+                self.assertIsNone(auth.authenticate(email, 'correct horse'))
+                hashed.assert_called_once_with('correct horse')
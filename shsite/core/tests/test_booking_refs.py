@@ -0,0 +1,82 @@
+import threading
+from django.db import connections, transaction
+from django.test import TransactionTestCase, override_settings
+from django.utils import timezone
+from core import booking_refs
+from core.models import AppUser, Booking, BookingSequence, ServiceProvider
+
+def run_in_threads(target, count: int) -> list:
+    """Run target in count threads, each on its own database connection; returns the exceptions raised."""
+    errors = []
+    def run():
+        try:
+            target()
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connections.close_all()
+    threads = [threading.Thread(target=run) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+@override_settings(BOOKING_REF_BLOCK_SIZE=3)
+class BookingReferenceTests(TransactionTestCase):
+    def setUp(self):
+        # reserved blocks live in the process, the counter rows in the flushed database
+        booking_refs._blocks.clear()
+
+    def test_numbers_are_handed_out_in_order_from_reserved_blocks(self):
+        self.assertEqual([booking_refs.next_booking_number(2026) for _ in range(7)], [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(BookingSequence.objects.get(year=2026).last_value, 9)
+
+    def test_each_year_has_its_own_counter(self):
+        booking_refs.next_booking_number(2026)
+        self.assertEqual(booking_refs.next_booking_number(2027), 1)
+
+    def test_reference_format(self):
+        self.assertEqual(booking_refs.generate_booking_ref(), f'GS{timezone.now().year}-000001')
+
+    def test_forked_worker_does_not_reuse_the_parent_block(self):
+        self.assertEqual(booking_refs.next_booking_number(2026), 1)
+        booking_refs._pid = -1
+        self.assertEqual(booking_refs.next_booking_number(2026), 4)
+
+    def test_a_rolled_back_reservation_is_not_reused(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.assertEqual(booking_refs.next_booking_number(2026), 1)
+            raise RuntimeError
+        # the rollback undid the counter update, so another worker now reserves the same block
+        other = booking_refs._reserve_block(2026, 3)
+        numbers = [booking_refs.next_booking_number(2026) for _ in range(3)]
+        self.assertEqual(other, (1, 3))
+        self.assertEqual(numbers, [4, 5, 6])
+
+    def test_a_block_reserved_inside_a_transaction_is_kept_once_it_commits(self):
+        with transaction.atomic():
+            self.assertEqual(booking_refs.next_booking_number(2026), 1)
+        self.assertEqual([booking_refs.next_booking_number(2026) for _ in range(3)], [2, 3, 4])
+        self.assertEqual(BookingSequence.objects.get(year=2026).last_value, 6)
+
+    def test_concurrent_workers_never_share_a_number(self):
+        # each thread stands in for a worker process reserving its own blocks
+        blocks = []
+        def reserve():
+            for _ in range(50):
+                blocks.append(booking_refs._reserve_block(2026, 3))
+        self.assertEqual(run_in_threads(reserve, 8), [])
+        numbers = [number for first, last in blocks for number in range(first, last + 1)]
+        self.assertEqual(len(numbers), 8 * 50 * 3)
+        self.assertEqual(len(set(numbers)), len(numbers))
+        self.assertEqual(BookingSequence.objects.get(year=2026).last_value, len(numbers))
+
+    def test_concurrent_hires_never_collide(self):
+        user = AppUser.objects.create(name='u', phone='1', email='u@gmail.com', password='x')
+        provider = ServiceProvider.objects.create(name='p', phone='2', password='x')
+        def hire():
+            for _ in range(25):
+                Booking.objects.create(booking_reference_id=booking_refs.generate_booking_ref(), user=user, service_provider=provider, service_name='s')
+        self.assertEqual(run_in_threads(hire, 8), [])
+        self.assertEqual(Booking.objects.values('booking_reference_id').distinct().count(), 200)
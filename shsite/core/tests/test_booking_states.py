@@ -0,0 +1,146 @@
+from unittest import mock
+from django.contrib.messages import get_messages
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+from core import booking_states
+from core.models import AppUser, Booking, ServiceProvider
+
+class BookingTestCase(TestCase):
+    """Two users' bookings with one provider; records every booking_transitioned signal in self.sent."""
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = AppUser.objects.create(name='Asha', phone='1', email='asha@gmail.com', password='x')
+        cls.other = AppUser.objects.create(name='Ravi', phone='2', email='ravi@gmail.com', password='x')
+        cls.provider = ServiceProvider.objects.create(name='Provider', phone='1', password='x')
+
+    def setUp(self):
+        self.sent = []
+        booking_states.booking_transitioned.connect(self.received)
+        self.addCleanup(booking_states.booking_transitioned.disconnect, self.received)
+        # the audit receiver would queue entries for the timer thread
+        patcher = mock.patch('core.audit.record')
+        self.audit_record = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def received(self, sender, transition, status, bookings, actor, app_user_id, **kwargs):
+        self.sent.append((transition, status, [reference for pk, reference in bookings], actor, app_user_id))
+
+    def add(self, status: str, count: int = 1, user=None) -> list:
+        start = Booking.objects.count()
+        return Booking.objects.bulk_create([
+            Booking(booking_reference_id=f'GS2026-{n:06d}', user=user or self.user, service_provider=self.provider, service_name='Plumber', status=status)
+            for n in range(start + 1, start + count + 1)
+        ])
+
+    def statuses(self) -> dict:
+        return dict(Booking.objects.values_list('booking_reference_id', 'status'))
+
+class BookingStatesTests(BookingTestCase):
+    def test_an_allowed_transition_moves_the_booking(self):
+        booking, = self.add('pending')
+        with self.captureOnCommitCallbacks(execute=True):
+            moved = booking_states.transition(Booking.objects.filter(pk=booking.pk), 'assign', actor='admin')
+        self.assertEqual(moved, [(booking.pk, booking.booking_reference_id)])
+        self.assertEqual(self.statuses(), {booking.booking_reference_id: 'assigned'})
+        self.assertEqual(self.sent, [('assign', 'assigned', [booking.booking_reference_id], 'admin', None)])
+        self.audit_record.assert_called_once_with('admin', f'assign {booking.booking_reference_id}', app_user_id=None)
+
+    def test_a_booking_in_another_state_is_left_alone(self):
+        completed, = self.add('completed')
+        assigned, = self.add('assigned')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(booking_states.transition(Booking.objects.all(), 'assign'), [])
+            self.assertEqual(booking_states.transition(Booking.objects.filter(pk=completed.pk), 'cancel'), [])
+        self.assertEqual(self.statuses(), {completed.booking_reference_id: 'completed', assigned.booking_reference_id: 'assigned'})
+        self.assertEqual(self.sent, [])
+
+    def test_bulk_transitions_run_in_chunks(self):
+        pending = self.add('pending', 5)
+        cancelled = self.add('cancelled', 2)
+        with self.captureOnCommitCallbacks(execute=True):
+            moved = booking_states.transition(Booking.objects.all(), 'complete', actor='admin', chunk_size=2)
+        self.assertEqual(sorted(moved), [(booking.pk, booking.booking_reference_id) for booking in pending])
+        self.assertEqual([len(references) for _, _, references, _, _ in self.sent], [2, 2, 1])
+        self.assertEqual(Booking.objects.filter(status='completed').count(), 5)
+        self.assertEqual(Booking.objects.filter(status='cancelled').count(), len(cancelled))
+
+    def test_the_signal_is_sent_only_once_the_transaction_commits(self):
+        booking, = self.add('pending')
+        with self.captureOnCommitCallbacks() as callbacks:
+            booking_states.transition(Booking.objects.all(), 'cancel', actor='asha@gmail.com', app_user_id=self.user.pk)
+            self.assertEqual(self.sent, [])
+        self.assertEqual(self.sent, [])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.sent, [('cancel', 'cancelled', [booking.booking_reference_id], 'asha@gmail.com', self.user.pk)])
+
+    def test_a_rolled_back_transition_sends_nothing(self):
+        self.add('pending')
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    booking_states.transition(Booking.objects.all(), 'cancel')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.sent, [])
+        self.assertFalse(Booking.objects.filter(status='cancelled').exists())
+
+    def test_hire_starts_assigned(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            booking = booking_states.hire(self.user, booking_reference_id='GS2026-000100', service_provider=self.provider, service_name='Plumber')
+        self.assertEqual(Booking.objects.get(pk=booking.pk).status, 'assigned')
+        self.assertEqual(self.sent, [('hire', 'assigned', ['GS2026-000100'], 'asha@gmail.com', self.user.pk)])
+
+class BookingViewTests(BookingTestCase):
+    def setUp(self):
+        super().setUp()
+        session = self.client.session
+        session.update({'user_id': self.user.pk, 'role': 'user'})
+        session.save()
+
+    def post(self, name: str, booking):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(reverse(name, args=[booking.pk]))
+
+    def messages(self, response) -> list:
+        return [str(message) for message in get_messages(response.wsgi_request)]
+
+    def test_cancel(self):
+        booking, = self.add('assigned')
+        response = self.post('booking_cancel', booking)
+        self.assertRedirects(response, reverse('user_dashboard'), fetch_redirect_response=False)
+        self.assertEqual(self.messages(response), ['Booking cancelled.'])
+        self.assertEqual(self.statuses(), {booking.booking_reference_id: 'cancelled'})
+        self.assertEqual(self.sent, [('cancel', 'cancelled', [booking.booking_reference_id], 'asha@gmail.com', self.user.pk)])
+
+    def test_complete(self):
+        booking, = self.add('pending')
+        response = self.post('booking_complete', booking)
+        self.assertEqual(self.messages(response), ['Marked booking as completed.'])
+        self.assertEqual(self.statuses(), {booking.booking_reference_id: 'completed'})
+
+    def test_a_finalized_booking_is_not_changed(self):
+        booking, = self.add('completed')
+        response = self.post('booking_cancel', booking)
+        self.assertRedirects(response, reverse('user_dashboard'), fetch_redirect_response=False)
+        self.assertEqual(self.messages(response), ['Booking already finalized.'])
+        self.assertEqual(self.statuses(), {booking.booking_reference_id: 'completed'})
+        self.assertEqual(self.sent, [])
+
+    def test_another_users_booking_is_not_found(self):
+        booking, = self.add('pending', user=self.other)
+        for name in ('booking_cancel', 'booking_complete'):
+            self.assertEqual(self.post(name, booking).status_code, 404)
+        self.assertEqual(self.statuses(), {booking.booking_reference_id: 'pending'})
+        self.assertEqual(self.sent, [])
+
+    def test_a_provider_session_is_sent_to_login(self):
+        booking, = self.add('pending')
+        session = self.client.session
+        session['role'] = 'provider'
+        session.save()
+        self.assertRedirects(self.post('booking_cancel', booking), reverse('login'), fetch_redirect_response=False)
+        self.assertEqual(self.statuses(), {booking.booking_reference_id: 'pending'})
@@ -0,0 +1,87 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from core.checks import BAD_PLAN_PATTERNS
+from core.models import AppUser, Booking, ServiceProvider, ServiceProviderCategory
+
+def add_bookings(user, count: int, start: int = 0):
+    for index in range(start, start + count):
+        provider = ServiceProvider.objects.create(name=f'Provider {index}', phone='1', password='x', location='Raipur')
+        ServiceProviderCategory.objects.create(provider=provider, category_name='Plumber', rent_value=100)
+        ServiceProviderCategory.objects.create(provider=provider, category_name='Electrician', rent_value=200)
+        Booking.objects.create(booking_reference_id=f'GS2026-{index + 1:06d}', user=user, service_provider=provider, service_name='Plumber')
+
+@override_settings(DASHBOARD_PAGE_SIZE=20)
+class UserDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = AppUser.objects.create(name='Asha', phone='1', email='asha@gmail.com', password='x')
+        session = self.client.session
+        session.update({'user_id': self.user.pk, 'role': 'user'})
+        session.save()
+
+    def dashboard_queries(self) -> int:
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('user_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_bookings(self):
+        add_bookings(self.user, 1)
+        self.dashboard_queries()
+        one = self.dashboard_queries()
+        add_bookings(self.user, 39, start=1)
+        self.assertEqual(self.dashboard_queries(), one)
+
+    def test_bookings_are_paginated_newest_first(self):
+        add_bookings(self.user, 25)
+        response = self.client.get(reverse('user_dashboard'))
+        page = response.context['bookings']
+        self.assertEqual(len(page.object_list), 20)
+        self.assertEqual(page.paginator.count, 25)
+        self.assertEqual(page.object_list[0].booking_reference_id, 'GS2026-000025')
+        self.assertEqual(len(self.client.get(reverse('user_dashboard'), {'page': 2}).context['bookings'].object_list), 5)
+
+@skipUnless(connection.vendor in BAD_PLAN_PATTERNS, 'no plan patterns for this database')
+class DashboardQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        providers = [ServiceProvider.objects.create(name=f'Provider {index}', phone='1', password='x') for index in range(5)]
+        cls.users = [AppUser.objects.create(name=f'User {index}', phone='1', email=f'user{index}@gmail.com', password='x') for index in range(4)]
+        now = timezone.now()
+        Booking.objects.bulk_create([
+            Booking(
+                booking_reference_id=f'GS2026-{user.pk:02d}{index:04d}', user=user, service_provider=providers[index % 5],
+                service_name='Plumber', booking_datetime=now - timedelta(hours=index), status=('pending', 'completed')[index % 2],
+            )
+            for user in cls.users
+            for index in range(500)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def plan(self, queryset) -> str:
+        if connection.vendor == 'postgresql':
+            # small tables are cheaper to scan, so ask whether an index can be used at all
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        return queryset.explain()
+
+    def test_dashboard_reads_the_users_bookings_from_the_index_in_order(self):
+        plan = self.plan(Booking.objects.for_dashboard(self.users[0])[:20])
+        self.assertIn('booking_user_datetime_idx', plan)
+        self.assertIsNone(BAD_PLAN_PATTERNS[connection.vendor].search(plan), plan)
+
+    def test_patterns_catch_a_sorted_plan(self):
+        plan = self.plan(Booking.objects.filter(user=self.users[0]).order_by('service_name')[:20])
+        self.assertIsNotNone(BAD_PLAN_PATTERNS[connection.vendor].search(plan), plan)
+
+    def test_system_check_passes(self):
+        call_command('check', databases=['default'], fail_level='ERROR', stdout=StringIO(), stderr=StringIO())
@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from core.email_policy import EmailDomainPolicy, get_policy, reload_policy
+from core.models import AllowedEmailDomain, AppUser
+
+def legacy_validate_email_domain(email: str, domains) -> bool:
+    """The check views.py and forms.py each carried before core.email_policy."""
+    allowed = [f'@{domain}' for domain in domains]
+    if '@' not in email:
+        return False
+    domain = email[email.find('@'):]
+    return any(domain.endswith(d) for d in allowed)
+
+def candidate_addresses(domains) -> list:
+    addresses = ['', 'gmail.com', 'user', 'user@', '@', 'user@localhost', 'user@gmail', 'user@com', 'user@notgmail.com']
+    for domain in domains:
+        addresses += [
+            f'user@{domain}', f'first.last+tag@{domain}', f'user@sub.{domain}', f'user@x{domain}',
+            f'user@{domain}.evil.com', f'user@{domain}.', f'user.{domain}@example.com', f'{domain}',
+        ]
+    return addresses
+
+class EmailDomainPolicyTests(SimpleTestCase):
+    def setUp(self):
+        self.domains = list(settings.ALLOWED_EMAIL_DOMAINS)
+        self.policy = EmailDomainPolicy(self.domains)
+
+    def test_matches_the_legacy_check(self):
+        for email in candidate_addresses(self.domains):
+            with self.subTest(email=email):
+                self.assertEqual(self.policy.allows(email), legacy_validate_email_domain(email, self.domains))
+
+    def test_subdomains_are_not_admitted(self):
+        for email in ('a@anything.edu', 'a@foo.gov.in', 'a@evil.gmail.com', 'a@iitb.ac.in'):
+            with self.subTest(email=email):
+                self.assertFalse(self.policy.allows(email))
+
+    def test_rejects_what_the_legacy_check_let_through(self):
+        # the legacy check matched from the first '@' and accepted an empty local part
+        for email in ('a@b@gmail.com', 'a@evil.com@gmail.com', '@gmail.com'):
+            with self.subTest(email=email):
+                self.assertFalse(self.policy.allows(email))
+
+    def test_domain_case_and_surrounding_space_are_ignored(self):
+        self.assertTrue(self.policy.allows(' Asha@GMail.COM '))
+        self.assertTrue(EmailDomainPolicy([' @Example.ORG ']).allows('a@example.org'))
+
+class EmailPolicyAdminTests(TestCase):
+    def setUp(self):
+        reload_policy()
+
+    def test_admin_domains_apply_after_an_edit(self):
+        self.assertFalse(get_policy().allows('a@partner.example'))
+        AllowedEmailDomain.objects.create(domain='partner.example')
+        self.assertTrue(get_policy().allows('a@partner.example'))
+        self.assertFalse(get_policy().allows('a@sub.partner.example'))
+        AllowedEmailDomain.objects.filter(domain='partner.example').update(is_active=False)
+        reload_policy()
+        self.assertFalse(get_policy().allows('a@partner.example'))
+
+    def test_register_admits_listed_domains_only(self):
+        for email in ('asha@evil.gmail.com', 'asha@gmail.com'):
+            self.client.post(reverse('register'), {'name': 'Asha', 'phone': '1', 'email': email, 'password': 'secret123'})
+        self.assertEqual(list(AppUser.objects.values_list('email', flat=True)), ['asha@gmail.com'])
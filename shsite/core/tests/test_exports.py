@@ -0,0 +1,103 @@
+import csv
+import os
+import tempfile
+import threading
+from io import StringIO
+from pathlib import Path
+from unittest import skipUnless
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, tag
+from django.utils import timezone
+from core import exports
+from core.models import AppUser, Booking, ServiceProvider
+
+def anonymous_rss() -> int:
+    """Resident bytes not backed by a file, so mmapped SQLite pages do not count."""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('RssAnon:'):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError('RssAnon missing from /proc/self/status')
+
+class PeakRss(threading.Thread):
+    """Samples anonymous RSS until stopped; peak is the growth over the level at start."""
+    def __init__(self, interval: float = 0.01):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.start_level = self.highest = anonymous_rss()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.highest = max(self.highest, anonymous_rss())
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.join()
+        self.highest = max(self.highest, anonymous_rss())
+
+    @property
+    def peak(self) -> int:
+        return self.highest - self.start_level
+
+def seed_bookings(count: int, users: int = 1000, providers: int = 100):
+    """Insert count bookings with one INSERT ... SELECT over a recursive counter."""
+    user_ids = AppUser.objects.bulk_create([
+        AppUser(name=f'User {n}', phone=f'8{n:09d}', email=f'user{n}@gmail.com', password='!') for n in range(users)
+    ])
+    provider_ids = ServiceProvider.objects.bulk_create([
+        ServiceProvider(name=f'Provider {n}', phone=f'9{n:09d}', password='!', location='Raipur') for n in range(providers)
+    ])
+    first_user, first_provider = min(user.pk for user in user_ids), min(provider.pk for provider in provider_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'INSERT INTO core_booking (booking_reference_id, user_id, service_provider_id, service_name, booking_datetime, status, final_amount) '
+            'WITH RECURSIVE counter(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM counter WHERE n < %s) '
+            "SELECT 'GS' || n, %s + n %% %s, %s + n %% %s, 'Plumber', %s, 'completed', 250.0 FROM counter",
+            [count, first_user, users, first_provider, providers, timezone.now()],
+        )
+
+class BookingExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed_bookings(3, users=2, providers=2)
+
+    def test_rows_join_user_and_provider(self):
+        rows = list(exports.booking_rows(Booking.objects.all(), chunk_size=2))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(len(rows[0]), len(exports.HEADERS))
+        self.assertEqual(rows[0][0], 'GS1')
+        self.assertTrue(rows[0][5].startswith('User '))
+        self.assertTrue(rows[0][8].startswith('Provider '))
+
+    def test_csv_has_a_header_and_one_line_per_booking(self):
+        text = ''.join(exports.csv_chunks(exports.booking_rows(Booking.objects.all()), chunk_bytes=10))
+        lines = list(csv.reader(StringIO(text)))
+        self.assertEqual(lines[0], exports.HEADERS)
+        self.assertEqual([line[0] for line in lines[1:]], ['GS1', 'GS2', 'GS3'])
+
+@tag('slow')
+@skipUnless(os.path.exists('/proc/self/status'), 'needs /proc to read RSS')
+class BookingExportMemoryTests(TestCase):
+    ROWS = 1_000_000
+    # growth over the idle process: streaming holds one chunk of rows (about 3 MB here), while
+    # materialising 1M rows takes over 900 MB
+    RSS_CEILING = 32 * 1024 * 1024
+
+    @classmethod
+    def setUpTestData(cls):
+        seed_bookings(cls.ROWS)
+
+    def test_csv_export_of_a_million_bookings_stays_under_the_ceiling(self):
+        with tempfile.TemporaryDirectory() as directory:
+            target = Path(directory) / 'bookings.csv'
+            with PeakRss() as rss:
+                call_command('export_bookings', str(target), stderr=StringIO())
+            with open(target, newline='', encoding='utf-8') as exported:
+                self.assertEqual(sum(1 for _ in exported), self.ROWS + 1)
+        self.assertLess(rss.peak, self.RSS_CEILING, f'export grew RSS by {rss.peak / 2 ** 20:.0f} MB')
@@ -0,0 +1,170 @@
+import smtplib
+import socketserver
+import threading
+from datetime import timedelta
+from io import StringIO
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from core.forms import OutboundEmailForm
+from core.mail import queue_mail, send_queued_mail
+from core.models import AppUser, OutboundEmail
+
+class FailingBackend(BaseEmailBackend):
+    def send_messages(self, email_messages):
+        raise smtplib.SMTPServerDisconnected('connection dropped')
+
+class RecordingBackend(BaseEmailBackend):
+    """Records, for every message, whether a transaction was open and what status its row had."""
+    seen = []
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            row = OutboundEmail.objects.get(subject=message.subject)
+            RecordingBackend.seen.append((connection.in_atomic_block, row.status))
+        return len(email_messages)
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply('220 localhost ready')
+        while line := self.rfile.readline():
+            command = line.decode().strip().upper()
+            if command == 'DATA':
+                self.reply('354 go ahead')
+                while self.rfile.readline() != b'.\r\n':
+                    pass
+                self.server.messages += 1
+                self.reply('250 queued')
+            elif command == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 ok')
+
+class HangingHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        self.server.connections += 1
+        # accept the connection and never greet, like a server that stopped answering
+        self.server.release.wait(10)
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+
+    def __init__(self, handler):
+        super().__init__(('127.0.0.1', 0), handler)
+        self.connections = 0
+        self.messages = 0
+        self.release = threading.Event()
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release.set()
+        self.shutdown()
+        self.server_close()
+
+def queue(count: int):
+    for index in range(count):
+        queue_mail(f'Message {index}', f'Your reset link: https://example.com/reset/{index}', 'noreply@local', [f'user{index}@example.com'])
+
+class MailQueueTests(TestCase):
+    def test_forgot_password_queues_without_sending(self):
+        AppUser.objects.create(name='Asha', phone='1', email='asha@gmail.com', password='x')
+        self.client.post(reverse('forgot_password'), {'email': 'asha@gmail.com', 'method': 'email'})
+        self.assertEqual(mail.outbox, [])
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.status, email.to), ('pending', 'asha@gmail.com'))
+        self.assertIn('/reset_password/', email.body)
+
+    def test_sent_mail_keeps_no_body(self):
+        queue(3)
+        self.assertEqual(send_queued_mail(), {'sent': 3, 'retried': 0, 'failed': 0})
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertIn('https://example.com/reset/0', mail.outbox[0].body)
+        self.assertEqual(set(OutboundEmail.objects.values_list('status', 'body')), {('sent', '')})
+
+    def test_batch_counts_are_in_the_log_message(self):
+        queue(2)
+        with self.assertLogs('core.mail', 'INFO') as logs:
+            send_queued_mail()
+        # the plain formatter prints the message only, not extra
+        self.assertIn('mail queue batch sent=2 retried=0 failed=0', [record.getMessage() for record in logs.records])
+
+    def test_batch_size_limits_one_run(self):
+        queue(3)
+        self.assertEqual(send_queued_mail(batch_size=2)['sent'], 2)
+        self.assertEqual(OutboundEmail.objects.filter(status='pending').count(), 1)
+
+    @override_settings(EMAIL_BACKEND='core.tests.test_mail.FailingBackend', MAIL_QUEUE_MAX_ATTEMPTS=2, MAIL_QUEUE_RETRY_BASE_SECONDS=30)
+    def test_failures_back_off_then_give_up_and_drop_the_body(self):
+        queue(1)
+        self.assertEqual(send_queued_mail()['retried'], 1)
+        email = OutboundEmail.objects.get()
+        self.assertEqual((email.status, email.attempts), ('pending', 1))
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=25))
+        self.assertIn('connection dropped', email.last_error)
+        self.assertTrue(email.body)
+        # not due yet, so nothing is claimed
+        self.assertEqual(send_queued_mail(), {'sent': 0, 'retried': 0, 'failed': 0})
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(send_queued_mail()['failed'], 1)
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.attempts, email.body), ('failed', 2, ''))
+
+    def test_expired_sending_lease_is_reclaimed(self):
+        queue(2)
+        # one row claimed by a worker that died mid-batch, one still leased to a live worker
+        OutboundEmail.objects.filter(subject='Message 0').update(status='sending', next_attempt_at=timezone.now() - timedelta(seconds=1))
+        OutboundEmail.objects.filter(subject='Message 1').update(status='sending', next_attempt_at=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(send_queued_mail()['sent'], 1)
+        self.assertEqual([message.subject for message in mail.outbox], ['Message 0'])
+
+    def test_admin_form_does_not_expose_the_body(self):
+        self.assertNotIn('body', OutboundEmailForm().fields)
+
+class MailTransactionTests(TransactionTestCase):
+    @override_settings(EMAIL_BACKEND='core.tests.test_mail.RecordingBackend')
+    def test_smtp_runs_outside_any_transaction(self):
+        RecordingBackend.seen = []
+        queue(3)
+        self.assertEqual(send_queued_mail()['sent'], 3)
+        # no transaction open and the rows already claimed, so another worker skips them
+        self.assertEqual(RecordingBackend.seen, [(False, 'sending')] * 3)
+        self.assertEqual(OutboundEmail.objects.filter(status='sent').count(), 3)
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend', EMAIL_HOST='127.0.0.1', EMAIL_USE_TLS=False, EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='')
+class SMTPDeliveryTests(TestCase):
+    def test_batch_shares_one_smtp_connection(self):
+        queue(5)
+        with SMTPServer(SMTPHandler) as server, self.settings(EMAIL_PORT=server.server_address[1]):
+            self.assertEqual(send_queued_mail()['sent'], 5)
+        self.assertEqual((server.connections, server.messages), (1, 5))
+
+    def test_unresponsive_server_times_out_and_retries(self):
+        queue(3)
+        with SMTPServer(HangingHandler) as server, self.settings(EMAIL_PORT=server.server_address[1], EMAIL_TIMEOUT=1):
+            self.assertEqual(send_queued_mail(), {'sent': 0, 'retried': 3, 'failed': 0})
+        self.assertEqual(server.connections, 1)
+        self.assertEqual(set(OutboundEmail.objects.values_list('status', 'attempts')), {('pending', 1)})
+
+class PurgeOutboundEmailTests(TestCase):
+    def test_purges_old_sent_and_failed_mail_only(self):
+        old = timezone.now() - timedelta(days=8)
+        for status in ('sent', 'failed', 'pending', 'sending'):
+            OutboundEmail.objects.create(subject=f'old {status}', body='', from_email='noreply@local', to='a@gmail.com', status=status, created_at=old)
+        OutboundEmail.objects.create(subject='recent sent', body='', from_email='noreply@local', to='a@gmail.com', status='sent')
+        call_command('purge_outbound_email', '--days', '7', '--chunk-size', '1', stdout=StringIO())
+        self.assertEqual(
+            set(OutboundEmail.objects.values_list('subject', flat=True)),
+            {'old pending', 'old sending', 'recent sent'},
+        )
@@ -0,0 +1,48 @@
+import importlib
+from types import SimpleNamespace
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase
+from core.models import AppUser, Booking, Category, ServiceCategoryStats, ServiceProvider, ServiceProviderCategory
+from core.search import search_services
+
+dedupe_categories = importlib.import_module('core.migrations.0009_dedupe_categories').dedupe_categories
+
+class DedupeCategoriesTests(TestCase):
+    def dedupe(self, *names) -> list:
+        provider = ServiceProvider.objects.create(name='Ravi', phone='1', password='x')
+        # bulk_create skips save(), so the rows keep their free-text names like before migration 0008
+        ServiceProviderCategory.objects.bulk_create([ServiceProviderCategory(provider=provider, category_name=name) for name in names])
+        dedupe_categories(apps, SimpleNamespace(connection=connection))
+        return sorted(set(ServiceProviderCategory.objects.values_list('category_name', flat=True)))
+
+    def test_most_common_spelling_wins(self):
+        self.assertEqual(self.dedupe('plumber', 'plumber', 'Plumber'), ['plumber'])
+
+    def test_leading_whitespace_does_not_win_a_tie(self):
+        self.assertEqual(self.dedupe(' plumber', 'Plumber'), ['Plumber'])
+
+    def test_padded_spellings_are_counted_together(self):
+        self.assertEqual(self.dedupe('plumber ', ' plumber', 'Plumber'), ['plumber'])
+
+    def test_ties_prefer_the_title_cased_spelling(self):
+        self.assertEqual(self.dedupe('ac repair', 'AC REPAIR', 'Ac Repair'), ['Ac Repair'])
+
+    def test_rows_point_at_one_category_per_slug(self):
+        self.dedupe('Plumber', ' plumber', 'Electrician')
+        self.assertEqual(sorted(Category.objects.values_list('slug', 'name')), [('electrician', 'Electrician'), ('plumber', 'Plumber')])
+        self.assertFalse(ServiceProviderCategory.objects.filter(category__isnull=True).exists())
+        self.assertEqual(ServiceCategoryStats.objects.get(category_name='Plumber').provider_count, 2)
+
+    def test_search_index_is_rebuilt_with_the_canonical_spelling(self):
+        # bulk_create skipped the indexing signals, so only the migration's rebuild fills the index
+        self.dedupe(' plumber', 'Plumber')
+        self.assertEqual([result.category_name for result in search_services('plumber')], ['Plumber', 'Plumber'])
+
+    def test_bookings_are_linked_by_service_name(self):
+        user = AppUser.objects.create(name='Asha', phone='1', email='asha@gmail.com', password='x')
+        provider = ServiceProvider.objects.create(name='Ravi', phone='1', password='x')
+        booking = Booking.objects.create(booking_reference_id='GS2026-000001', user=user, service_provider=provider, service_name='plumber')
+        self.dedupe('Plumber')
+        booking.refresh_from_db()
+        self.assertEqual(booking.category.name, 'Plumber')
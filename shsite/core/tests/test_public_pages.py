@@ -0,0 +1,156 @@
+import pickle
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core import caching
+from core.company import clear_company_info_cache, get_company_info
+from core.models import CompanyInfo, ServiceProvider, ServiceProviderCategory
+
+class PublicPageTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command('seed_demo_data', stdout=StringIO())
+        CompanyInfo.objects.create(company_name='ServiceHands')
+
+    def setUp(self):
+        cache.clear()
+        clear_company_info_cache()
+
+class BootstrapQueryTests(PublicPageTestCase):
+    def test_warm_home_runs_no_queries(self):
+        self.client.get(reverse('home'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'))
+        self.assertContains(response, 'Rahul Kumar')
+        self.assertContains(response, 'ServiceHands')
+
+    def test_browse_services_runs_only_its_page_queries(self):
+        self.client.get(reverse('browse_services'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('browse_services'))
+        self.assertContains(response, 'Sita Devi')
+        # the provider page and its categories; no seeding count and no CompanyInfo lookup
+        self.assertEqual(len(queries), 2)
+        self.assertFalse([query for query in queries if 'core_companyinfo' in query['sql'] or 'COUNT(' in query['sql']])
+
+    def test_requests_never_seed_demo_data(self):
+        ServiceProvider.objects.all().delete()
+        self.client.get(reverse('home'))
+        self.client.get(reverse('browse_services'))
+        self.assertFalse(ServiceProvider.objects.exists())
+
+    def test_company_info_is_cached_until_saved(self):
+        company = get_company_info()
+        with self.assertNumQueries(0):
+            self.assertIs(get_company_info(), company)
+        company.company_name = 'Renamed'
+        company.save()
+        self.assertEqual(get_company_info().company_name, 'Renamed')
+
+class PublicCacheTests(PublicPageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.provider = ServiceProvider.objects.get(name='Rahul Kumar')
+        self.client.get(reverse('home'))
+        self.client.get(reverse('provider_detail', args=[self.provider.pk]))
+
+    def test_cached_providers_carry_no_password_hash(self):
+        cached = [*cache.get(caching.HOME_PROVIDERS_KEY), cache.get(caching.provider_key(self.provider.pk))]
+        for provider in cached:
+            self.assertNotIn('password', provider.__dict__)
+        self.assertNotIn(self.provider.password.encode(), pickle.dumps(cached))
+
+    def test_cached_pages_need_no_queries(self):
+        with self.assertNumQueries(0):
+            self.client.get(reverse('provider_detail', args=[self.provider.pk]))
+
+    def test_saving_a_provider_invalidates_its_pages(self):
+        self.provider.name = 'Rahul K.'
+        self.provider.save()
+        self.assertContains(self.client.get(reverse('home')), 'Rahul K.')
+        self.assertContains(self.client.get(reverse('provider_detail', args=[self.provider.pk])), 'Rahul K.')
+
+    def test_editing_a_category_invalidates_its_provider(self):
+        category = self.provider.categories.get(category_name='Electrician')
+        category.category_name = 'Wiring'
+        category.save()
+        self.assertContains(self.client.get(reverse('home')), 'Wiring')
+        self.assertContains(self.client.get(reverse('provider_detail', args=[self.provider.pk])), 'Wiring')
+
+class ConditionalGetTests(PublicPageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.provider = ServiceProvider.objects.get(name='Sita Devi')
+        self.url = reverse('provider_detail', args=[self.provider.pk])
+
+    def assertNotModified(self, url, headers: dict, max_queries: int):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.templates, [])
+        self.assertLessEqual(len(queries), max_queries)
+
+    def test_provider_etag_answers_304_without_rendering(self):
+        etag = self.client.get(self.url)['ETag']
+        self.assertNotModified(self.url, {'If-None-Match': etag}, 0)
+
+    def test_provider_304_after_cache_eviction_runs_one_query(self):
+        etag = self.client.get(self.url)['ETag']
+        cache.clear()
+        self.assertNotModified(self.url, {'If-None-Match': etag}, 1)
+
+    def test_provider_last_modified_answers_304(self):
+        last_modified = self.client.get(self.url)['Last-Modified']
+        self.assertNotModified(self.url, {'If-Modified-Since': last_modified}, 0)
+
+    def test_browse_services_etag_answers_304(self):
+        url = reverse('browse_services')
+        etag = self.client.get(url)['ETag']
+        self.assertNotModified(url, {'If-None-Match': etag}, 0)
+
+    def test_changing_the_provider_changes_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        self.provider.categories.create(category_name='Tiffin Service')
+        response = self.client.get(self.url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Tiffin Service')
+        self.assertNotEqual(response['ETag'], etag)
+
+@override_settings(BROWSE_PAGE_SIZE=2)
+class BrowseServicesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # the two Ashas straddle the first page boundary, so the cursor has to break the tie on id
+        for index, name in enumerate(['Aaron', 'Asha', 'Asha', 'Bina', 'Dev']):
+            provider = ServiceProvider.objects.create(name=name, phone=str(index), password='x', location='Raipur' if index % 2 else 'Korba')
+            ServiceProviderCategory.objects.create(provider=provider, category_name='Plumber' if index < 3 else 'Electrician')
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, **params) -> list:
+        response = self.client.get(reverse('browse_services'), params)
+        found = [provider.pk for provider in response.context['providers']]
+        while response.context['next_url']:
+            response = self.client.get(reverse('browse_services') + response.context['next_url'])
+            found += [provider.pk for provider in response.context['providers']]
+        return found
+
+    def expected(self, **filters) -> list:
+        return list(ServiceProvider.objects.filter(**filters).order_by('name', 'id').values_list('pk', flat=True))
+
+    def test_cursor_walks_every_provider_once_in_name_order(self):
+        self.assertEqual(self.walk(), self.expected())
+
+    def test_small_and_large_categories_list_the_same_providers(self):
+        for limit in (0, 1000):
+            with self.subTest(BROWSE_SMALL_CATEGORY_MAX=limit), override_settings(BROWSE_SMALL_CATEGORY_MAX=limit):
+                self.assertEqual(self.walk(category='plumber'), self.expected(categories__category_name='Plumber'))
+
+    def test_location_and_category_filters_combine(self):
+        self.assertEqual(self.walk(category='Plumber', location='Raipur'), self.expected(categories__category_name='Plumber', location='Raipur'))
+        self.assertEqual(self.walk(category='No such service'), [])
@@ -0,0 +1,126 @@
+import sqlite3
+import tempfile
+from pathlib import Path
+from unittest import mock
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from core import routers
+from core.middleware import ReplicaMiddleware
+from core.models import ServiceProvider
+
+def add_database(alias: str, name):
+    connections.settings[alias] = connections.configure_settings({
+        DEFAULT_DB_ALIAS: {},
+        alias: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(name)},
+    })[alias]
+
+def remove_database(alias: str):
+    connections[alias].close()
+    del connections[alias]
+    del connections.settings[alias]
+
+class ReplicaRouterTests(TestCase):
+    """
+    A copy of the test database stands in for a replica: rows created on the primary inside
+    the test are missing from it, and a row only the replica holds shows where a read went.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.directory = tempfile.TemporaryDirectory()
+        replica = Path(cls.directory.name) / 'replica.sqlite3'
+        with sqlite3.connect(connection.settings_dict['NAME']) as primary, sqlite3.connect(replica) as copy:
+            primary.backup(copy)
+        add_database('replica0', replica)
+        ServiceProvider.objects.using('replica0').create(name='Only on the replica', phone='1', password='x')
+
+    @classmethod
+    def tearDownClass(cls):
+        remove_database('replica0')
+        cls.directory.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        routers._down_until.clear()
+        ServiceProvider.objects.create(name='Only on the primary', phone='2', password='x')
+
+    def read_names(self) -> set:
+        return set(ServiceProvider.objects.values_list('name', flat=True))
+
+    def test_safe_requests_read_from_the_replica(self):
+        with routers.replica_reads(True):
+            self.assertEqual(self.read_names(), {'Only on the replica'})
+        with routers.replica_reads(False):
+            self.assertEqual(self.read_names(), {'Only on the primary'})
+        self.assertEqual(self.read_names(), {'Only on the primary'})
+
+    def test_reads_after_a_write_stay_on_the_primary(self):
+        with routers.replica_reads(True) as state:
+            self.assertIn('Only on the replica', self.read_names())
+            ServiceProvider.objects.create(name='Just written', phone='3', password='x')
+            self.assertEqual(self.read_names(), {'Only on the primary', 'Just written'})
+        self.assertTrue(state['wrote'])
+
+    def test_use_primary_returns_to_the_replica_when_nothing_was_written(self):
+        with routers.replica_reads(True):
+            with routers.use_primary():
+                self.assertEqual(self.read_names(), {'Only on the primary'})
+            self.assertEqual(self.read_names(), {'Only on the replica'})
+
+    def test_a_write_inside_use_primary_keeps_the_request_on_the_primary(self):
+        with routers.replica_reads(True):
+            with routers.use_primary():
+                ServiceProvider.objects.create(name='Just written', phone='3', password='x')
+            self.assertEqual(self.read_names(), {'Only on the primary', 'Just written'})
+
+    def test_an_unreachable_replica_falls_back_to_the_primary(self):
+        add_database('replica1', Path(self.directory.name) / 'missing' / 'replica.sqlite3')
+        self.addCleanup(remove_database, 'replica1')
+        # try the broken replica first
+        with mock.patch('core.routers.random.shuffle', lambda aliases: aliases.sort(reverse=True)):
+            with routers.replica_reads(True) as state:
+                self.assertEqual(self.read_names(), {'Only on the replica'})
+        self.assertEqual(state['alias'], 'replica0')
+        self.assertIn('replica1', routers._down_until)
+        remove_database('replica0')
+        self.addCleanup(add_database, 'replica0', Path(self.directory.name) / 'replica.sqlite3')
+        with routers.replica_reads(True):
+            self.assertEqual(self.read_names(), {'Only on the primary'})
+
+class ReplicaMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # never connected to; the middleware only needs a replica to be configured
+        add_database('replica0', ':memory:')
+
+    @classmethod
+    def tearDownClass(cls):
+        remove_database('replica0')
+        super().tearDownClass()
+
+    def run_request(self, request, write: bool = False):
+        seen = {}
+
+        def view(request):
+            seen['replica'] = routers._state.get()['replica']
+            if write:
+                routers.ReplicaRouter().db_for_write(ServiceProvider)
+            return HttpResponse()
+
+        return ReplicaMiddleware(view)(request), seen['replica']
+
+    def test_only_safe_unpinned_requests_may_use_the_replica(self):
+        factory = RequestFactory()
+        self.assertTrue(self.run_request(factory.get('/'))[1])
+        self.assertFalse(self.run_request(factory.post('/'))[1])
+        pinned = factory.get('/')
+        pinned.COOKIES[routers.PIN_COOKIE] = '1'
+        self.assertFalse(self.run_request(pinned)[1])
+
+    def test_a_write_pins_the_client_to_the_primary(self):
+        response, _ = self.run_request(RequestFactory().post('/'), write=True)
+        self.assertIn(routers.PIN_COOKIE, response.cookies)
+        response, _ = self.run_request(RequestFactory().get('/'))
+        self.assertNotIn(routers.PIN_COOKIE, response.cookies)
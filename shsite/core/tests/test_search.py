@@ -0,0 +1,66 @@
+from django.test import TestCase, override_settings
+from core.models import ServiceProvider, ServiceProviderCategory
+from core.search import search_services
+
+def names(results) -> list:
+    return [(result.provider.name, result.category_name) for result in results]
+
+class SearchServicesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.rahul = ServiceProvider.objects.create(name='Rahul Kumar', phone='1', password='!', location='Raipur')
+        cls.sita = ServiceProvider.objects.create(name='Sita Devi', phone='2', password='!', location='Korba')
+        cls.plumber = ServiceProviderCategory.objects.create(
+            provider=cls.rahul, category_name='Plumber', description='Licensed, with free estimates', rent_value=300,
+        )
+        cls.electrician = ServiceProviderCategory.objects.create(
+            provider=cls.sita, category_name='Electrician', description='Wiring for homes; plumber referrals on request',
+        )
+
+    def test_a_category_name_match_ranks_above_a_description_match(self):
+        self.assertEqual(names(search_services('plumber')), [('Rahul Kumar', 'Plumber'), ('Sita Devi', 'Electrician')])
+
+    def test_words_match_by_prefix(self):
+        self.assertEqual(names(search_services('elec')), [('Sita Devi', 'Electrician')])
+        self.assertEqual(names(search_services('RAI')), [('Rahul Kumar', 'Plumber')])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(names(search_services('plumber korba')), [('Sita Devi', 'Electrician')])
+        self.assertEqual(search_services('plumber helicopter'), [])
+
+    def test_a_one_letter_query_lists_the_categories_it_starts(self):
+        self.assertEqual(names(search_services('p')), [('Rahul Kumar', 'Plumber')])
+        self.assertEqual(names(search_services('E ')), [('Sita Devi', 'Electrician')])
+        self.assertEqual(search_services('x'), [])
+        self.assertEqual(search_services(' '), [])
+
+    def test_one_letter_words_beside_longer_ones_are_ignored(self):
+        self.assertEqual(names(search_services('a plumber')), names(search_services('plumber')))
+
+    @override_settings(SEARCH_RANK_CANDIDATES=1)
+    def test_only_the_candidates_are_ranked(self):
+        self.assertEqual(len(search_services('plumber')), 1)
+
+    def test_results_stop_at_the_limit(self):
+        self.assertEqual(len(search_services('plumber', limit=1)), 1)
+
+    def test_saving_a_category_reindexes_it(self):
+        self.electrician.category_name = 'Carpenter'
+        self.electrician.description = 'Doors and windows'
+        self.electrician.save()
+        self.assertEqual(names(search_services('carpenter')), [('Sita Devi', 'Carpenter')])
+        self.assertEqual(search_services('electrician'), [])
+        self.assertEqual(names(search_services('plumber')), [('Rahul Kumar', 'Plumber')])
+
+    def test_deleting_a_category_removes_it(self):
+        self.plumber.delete()
+        self.assertEqual(names(search_services('plumber')), [('Sita Devi', 'Electrician')])
+        self.assertEqual(search_services('raipur'), [])
+
+    def test_renaming_a_provider_reindexes_their_categories(self):
+        self.rahul.name = 'Ravi Sahu'
+        self.rahul.location = 'Durg'
+        self.rahul.save()
+        self.assertEqual(names(search_services('ravi durg')), [('Ravi Sahu', 'Plumber')])
+        self.assertEqual(search_services('rahul'), [])
+        self.assertEqual(search_services('raipur'), [])
@@ -0,0 +1,40 @@
+from django.db.models import Avg, Count, Max, Min
+from django.test import TestCase, TransactionTestCase
+from core.models import ServiceCategoryStats, ServiceProvider, ServiceProviderCategory
+from core.tests.test_booking_refs import run_in_threads
+
+class CategoryStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.provider = ServiceProvider.objects.create(name='Ravi', phone='1', password='x')
+
+    def stats(self, name: str):
+        return ServiceCategoryStats.objects.filter(category_name=name).values_list('provider_count', 'min_rent', 'max_rent', 'avg_rent').first()
+
+    def test_saves_and_deletes_keep_the_stats_current(self):
+        cheap = ServiceProviderCategory.objects.create(provider=self.provider, category_name='Plumber', rent_value=100)
+        ServiceProviderCategory.objects.create(provider=self.provider, category_name='Plumber', rent_value=300)
+        self.assertEqual(self.stats('Plumber'), (2, 100, 300, 200))
+        cheap.delete()
+        self.assertEqual(self.stats('Plumber'), (1, 300, 300, 300))
+
+    def test_a_rename_moves_the_row_between_categories(self):
+        category = ServiceProviderCategory.objects.create(provider=self.provider, category_name='Plumber', rent_value=100)
+        category.category_name = 'Electrician'
+        category.save()
+        self.assertIsNone(self.stats('Plumber'))
+        self.assertEqual(self.stats('Electrician'), (1, 100, 100, 100))
+
+class ConcurrentCategoryStatsTests(TransactionTestCase):
+    def test_concurrent_saves_leave_the_true_aggregate(self):
+        provider = ServiceProvider.objects.create(name='Ravi', phone='1', password='x')
+        def add(start: int):
+            for rent in range(start, start + 10):
+                ServiceProviderCategory.objects.create(provider=provider, category_name='Plumber', rent_value=rent)
+        starts = iter(range(0, 80, 10))
+        self.assertEqual(run_in_threads(lambda: add(next(starts)), 8), [])
+        expected = ServiceProviderCategory.objects.aggregate(
+            provider_count=Count('id'), min_rent=Min('rent_value'), max_rent=Max('rent_value'), avg_rent=Avg('rent_value'),
+        )
+        self.assertEqual(ServiceCategoryStats.objects.values('provider_count', 'min_rent', 'max_rent', 'avg_rent').get(), expected)
+        self.assertEqual(expected['provider_count'], 80)
@@ -1,70 +1,59 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpRequest, HttpResponse
+from django.http import Http404, HttpRequest, HttpResponse
 from django.urls import reverse
 from django.utils import timezone
+from django.conf import settings
 from django.contrib import messages
-from django.contrib.auth.hashers import make_password, check_password
-from django.core.mail import send_mail
+from django.core.paginator import Paginator
+from django.contrib.auth.hashers import make_password
 from .forms import UserProfileForm, UserChangePasswordForm
-from .models import AppUser, ServiceProvider, ServiceProviderCategory, Booking, CompanyInfo, PasswordReset
-from django.db.models import Count
-import random
-import string
-
-def seed_demo_data():
-    if ServiceProvider.objects.count() == 0:
-        p1 = ServiceProvider.objects.create(name='Rahul Kumar', phone='9876543210', password=make_password('pass123'), location='Janjgir, CG')
-        p2 = ServiceProvider.objects.create(name='Sita Devi', phone='9123456780', password=make_password('pass123'), location='Pamgarh, CG')
-        p3 = ServiceProvider.objects.create(name='Arjun Verma', phone='9001122334', password=make_password('pass123'), location='Champa, CG')
-        ServiceProviderCategory.objects.bulk_create([
-            ServiceProviderCategory(provider=p1, category_name='Electrician'),
-            ServiceProviderCategory(provider=p1, category_name='AC Repair'),
-            ServiceProviderCategory(provider=p2, category_name='Plumber'),
-            ServiceProviderCategory(provider=p2, category_name='Water Purifier'),
-            ServiceProviderCategory(provider=p3, category_name='Carpenter'),
-        ])
-
-def generate_booking_ref():
-    year = str(timezone.now().year)
-    last = Booking.objects.filter(booking_reference_id__startswith=f'GS{year}-').order_by('-id').first()
-    if last:
-        last_num = int(last.booking_reference_id.split('-')[1])
-        new_num = f'{last_num + 1:06d}'
-    else:
-        new_num = '000001'
-    return f'GS{year}-{new_num}'
+from .models import AppUser, ServiceProvider, Category, ServiceProviderCategory, ServiceCategoryStats, Booking, PasswordReset
+from . import auth, booking_states, caching, instrumentation
+from .booking_refs import generate_booking_ref
+from .company import get_company_info
+from .email_policy import validate_email_domain
+from .mail import queue_mail
+from .middleware import get_app_user
+from .ratelimit import ratelimit
+from .search import search_services
+from django.core import signing
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import condition
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Prefetch, Q, Subquery
+import hashlib
+import secrets
 
-def generate_reset_token():
-    return ''.join(random.choices(string.ascii_letters + string.digits, k=32))
+# the provider columns the public templates and their ETags read; the password hash never goes into the cache
+PUBLIC_PROVIDER_FIELDS = ('id', 'name', 'phone', 'location', 'updated_at')
 
-def validate_email_domain(email: str):
-    allowed = ['@edu', '@edu.in', '@ac.in', '@gov.in', '@nic.in', '@companyname.com', '@companyname.in', '@startupname.io', '@organization.org', '@college.edu', '@college.ac.in', '@rediffmail.com', '@yandex.com', '@gmail.com', '@yahoo.com', '@yahoo.co.in', '@outlook.com', '@hotmail.com', '@live.com', '@icloud.com', '@aol.com', '@protonmail.com', '@zoho.com']
-    domain = email[email.find('@'):]
-    return any(domain.endswith(d) for d in allowed)
+def generate_reset_token():
+    return secrets.token_urlsafe(32)
 
 def home(request: HttpRequest) -> HttpResponse:
-    company = CompanyInfo.objects.first()
-    if not company:
-        company = CompanyInfo.objects.create()
-    seed_demo_data()
-    providers = ServiceProvider.objects.prefetch_related('categories').all().order_by('name')[:6]
-    services = ServiceProviderCategory.objects.values('category_name').annotate(count=Count('id')).order_by('category_name')[:8]
-    return render(request, 'home.html', {'company': company, 'providers': providers, 'services': services})
+    company = get_company_info()
+    providers = caching.get_or_set(caching.HOME_PROVIDERS_KEY, lambda: list(
+        ServiceProvider.objects.only(*PUBLIC_PROVIDER_FIELDS).prefetch_related(
+            Prefetch('categories', queryset=ServiceProviderCategory.objects.only('id', 'provider_id', 'category_name'))
+        ).order_by('name')[:6]
+    ))
+    services = caching.get_or_set(caching.HOME_SERVICES_KEY, lambda: list(ServiceCategoryStats.objects.order_by('category_name')[:8]))
+    return render(request, 'home.html', {'company': company, 'providers': providers, 'services': services, 'cache_timeout': settings.PUBLIC_CACHE_TIMEOUT})
 
 def register(request: HttpRequest) -> HttpResponse:
     if request.method == 'POST':
         name = request.POST.get('name', '')
         phone = request.POST.get('phone', '')
         email = request.POST.get('email', '')
-        password = make_password(request.POST.get('password', ''))
         address = request.POST.get('address', '')
         role = request.POST.get('role', 'user')
         if not validate_email_domain(email):
             messages.error(request, 'Email domain not allowed for registration.')
             return redirect('register')
-        if AppUser.objects.filter(email=email).exists():
+        if auth.email_taken(email):
             messages.error(request, 'Email already exists.')
             return redirect('register')
+        password = make_password(request.POST.get('password', ''))
         user = AppUser.objects.create(name=name, phone=phone, email=email, password=password, address=address, role=role)
         if role == 'service_provider':
             ServiceProvider.objects.create(name=name, phone=phone, password=password)
@@ -72,12 +61,13 @@ def register(request: HttpRequest) -> HttpResponse:
         return redirect('login')
     return render(request, 'register.html')
 
+@ratelimit('login', 'RATELIMIT_LOGIN')
 def login(request: HttpRequest) -> HttpResponse:
     if request.method == 'POST':
         email = request.POST.get('email', '')
         password = request.POST.get('password', '')
-        user = AppUser.objects.filter(email=email).first()
-        if user and check_password(password, user.password):
+        user = auth.authenticate(email, password)
+        if user:
             request.session['user_id'] = user.id
             request.session['role'] = user.role
             if user.role == 'admin':
@@ -93,6 +83,7 @@ def logout(request: HttpRequest) -> HttpResponse:
     request.session.flush()
     return redirect('home')
 
+@ratelimit('forgot_password', 'RATELIMIT_PASSWORD_RESET')
 def forgot_password(request: HttpRequest) -> HttpResponse:
     if request.method == 'POST':
         email = request.POST.get('email', '')
@@ -100,10 +91,13 @@ def forgot_password(request: HttpRequest) -> HttpResponse:
         user = AppUser.objects.filter(email=email).first()
         if user:
             token = generate_reset_token()
-            reset = PasswordReset.objects.create(user=user, token=token, expiry=timezone.now() + timezone.timedelta(hours=1))
+            with transaction.atomic():
+                # a new request supersedes any live token, so each user has at most one
+                PasswordReset.objects.filter(user=user).delete()
+                PasswordReset.objects.create(user=user, token_hash=PasswordReset.hash_token(token), expiry=timezone.now() + timezone.timedelta(hours=1))
             if method == 'email':
                 link = request.build_absolute_uri(reverse('reset_password', args=[token]))
-                send_mail('Password Reset', f'Your reset link: {link}', 'noreply@local', [email], fail_silently=True)
+                queue_mail('Password Reset', f'Your reset link: {link}', 'noreply@local', [email])
                 messages.success(request, 'Reset link sent to email.')
             elif method == 'whatsapp':
                 link = request.build_absolute_uri(reverse('reset_password', args=[token]))
@@ -113,20 +107,16 @@ def forgot_password(request: HttpRequest) -> HttpResponse:
     return render(request, 'forgot_password.html')
 
 def reset_password(request: HttpRequest, token: str) -> HttpResponse:
-    reset = PasswordReset.objects.filter(token=token).first()
+    reset = PasswordReset.objects.filter(token_hash=PasswordReset.hash_token(token)).first()
     if not reset or reset.expiry < timezone.now():
         messages.error(request, 'Invalid or expired token.')
         return redirect('login')
     if request.method == 'POST':
         password = make_password(request.POST.get('password', ''))
         if reset.user_id:
-            user = reset.user
-            user.password = password
-            user.save()
+            AppUser.objects.filter(pk=reset.user_id).update(password=password)
         elif reset.service_provider_id:
-            provider = reset.service_provider
-            provider.password = password
-            provider.save()
+            ServiceProvider.objects.filter(pk=reset.service_provider_id).update(password=password)
         reset.delete()
         messages.success(request, 'Password reset successful.')
         return redirect('login')
@@ -135,15 +125,19 @@ def reset_password(request: HttpRequest, token: str) -> HttpResponse:
 def user_dashboard(request: HttpRequest) -> HttpResponse:
     if request.session.get('role') != 'user':
         return redirect('login')
-    user = AppUser.objects.get(id=request.session['user_id'])
-    bookings = Booking.objects.filter(user=user).order_by('-booking_datetime')
-    company = CompanyInfo.objects.first()
+    user = get_app_user(request)
+    if user is None:
+        return redirect('login')
+    bookings = Paginator(Booking.objects.for_dashboard(user), settings.DASHBOARD_PAGE_SIZE).get_page(request.GET.get('page'))
+    company = get_company_info()
     return render(request, 'dashboard_user.html', {'user': user, 'bookings': bookings, 'company': company})
 
 def edit_profile(request: HttpRequest) -> HttpResponse:
     if request.session.get('role') != 'user':
         return redirect('login')
-    user = AppUser.objects.get(id=request.session['user_id'])
+    user = get_app_user(request)
+    if user is None:
+        return redirect('login')
     if request.method == 'POST':
         form = UserProfileForm(request.POST, instance=user)
         if form.is_valid():
@@ -157,49 +151,133 @@ def edit_profile(request: HttpRequest) -> HttpResponse:
 def change_password(request: HttpRequest) -> HttpResponse:
     if request.session.get('role') != 'user':
         return redirect('login')
-    user = AppUser.objects.get(id=request.session['user_id'])
+    user = get_app_user(request)
+    if user is None:
+        return redirect('login')
     if request.method == 'POST':
         form = UserChangePasswordForm(request.POST)
         if form.is_valid():
             old = form.cleaned_data['old_password']
             new = form.cleaned_data['new_password']
-            if not check_password(old, user.password):
-                messages.error(request, 'Current password is incorrect.')
-            elif check_password(new, user.password):
-                messages.error(request, 'New password must be different from current.')
+            error = auth.change_password(user, old, new)
+            if error:
+                messages.error(request, error)
             else:
-                user.password = make_password(new)
-                user.save()
                 messages.success(request, 'Password changed successfully.')
                 return redirect('user_dashboard')
     else:
         form = UserChangePasswordForm()
     return render(request, 'change_password.html', {'form': form})
+def _public_etag(request: HttpRequest, last_modified) -> str | None:
+    if last_modified is None or request.COOKIES.get('messages'):
+        return None
+    key = f"{last_modified.isoformat()}|{request.get_full_path()}|{request.session.get('user_id')}"
+    return hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+def _browse_last_modified(request: HttpRequest):
+    return caching.directory_last_modified()
+
+def _browse_etag(request: HttpRequest):
+    return _public_etag(request, _browse_last_modified(request))
+
+def _provider_last_modified(request: HttpRequest, pk: int):
+    if not hasattr(request, '_provider_last_modified'):
+        provider = caching.cached_provider(pk)
+        if provider is not None:
+            request._provider_last_modified = provider.updated_at
+        else:
+            request._provider_last_modified = ServiceProvider.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    return request._provider_last_modified
+
+def _provider_etag(request: HttpRequest, pk: int):
+    return _public_etag(request, _provider_last_modified(request, pk))
+
+@condition(etag_func=_browse_etag, last_modified_func=_browse_last_modified)
 def browse_services(request: HttpRequest) -> HttpResponse:
-    seed_demo_data()
-    providers = ServiceProvider.objects.prefetch_related('categories').all().order_by('name')
-    return render(request, 'browse_services.html', {'providers': providers})
+    category = request.GET.get('category', '').strip()
+    location = request.GET.get('location', '').strip()
+    providers = ServiceProvider.objects.prefetch_related(
+        Prefetch('categories', queryset=ServiceProviderCategory.objects.only('id', 'provider_id', 'category_name'))
+    ).only('id', 'name', 'phone', 'location').order_by('name', 'id')
+    if category:
+        found = Category.objects.filter(slug=Category.slug_for(category)).annotate(
+            provider_count=Subquery(ServiceCategoryStats.objects.filter(category_name=OuterRef('name')).values('provider_count')[:1]),
+        ).values_list('id', 'provider_count').first()
+        if found:
+            category_id, provider_count = found
+            in_category = ServiceProviderCategory.objects.filter(category_id=category_id)
+            if (provider_count or 0) <= settings.BROWSE_SMALL_CATEGORY_MAX:
+                # read a small category's providers off its index and sort them; walking the name index
+                # would pass nearly every provider in the directory before filling a page
+                providers = providers.filter(pk__in=in_category.values('provider_id'))
+            else:
+                providers = providers.filter(Exists(in_category.filter(provider=OuterRef('pk'))))
+        else:
+            providers = providers.none()
+    if location:
+        providers = providers.filter(location=location)
+    cursor = request.GET.get('after')
+    if cursor:
+        try:
+            name, pk = signing.loads(cursor, salt='browse_services')
+            # name >= lets the (name, id) index seek to the cursor; the OR on its own scans from the first row
+            providers = providers.filter(Q(name__gte=name), Q(name__gt=name) | Q(id__gt=pk))
+        except (signing.BadSignature, TypeError, ValueError):
+            cursor = None
+    page_size = settings.BROWSE_PAGE_SIZE
+    providers = list(providers[:page_size + 1])
+    params = request.GET.copy()
+    params.pop('after', None)
+    first_url = f'?{params.urlencode()}' if cursor else None
+    next_url = None
+    if len(providers) > page_size:
+        providers = providers[:page_size]
+        params['after'] = signing.dumps([providers[-1].name, providers[-1].pk], salt='browse_services')
+        next_url = f'?{params.urlencode()}'
+    return render(request, 'browse_services.html', {
+        'providers': providers,
+        'category': category,
+        'location': location,
+        'first_url': first_url,
+        'cache_timeout': settings.PUBLIC_CACHE_TIMEOUT,
+        'next_url': next_url,
+    })
 
+def search(request: HttpRequest) -> HttpResponse:
+    query = request.GET.get('q', '').strip()
+    results = search_services(query, limit=settings.SEARCH_RESULTS_LIMIT) if query else []
+    return render(request, 'search.html', {'query': query, 'results': results})
+
+@condition(etag_func=_provider_etag, last_modified_func=_provider_last_modified)
 def provider_detail(request: HttpRequest, pk: int) -> HttpResponse:
-    provider = get_object_or_404(ServiceProvider.objects.prefetch_related('categories'), pk=pk)
+    provider = caching.get_or_set(caching.provider_key(pk), lambda: get_object_or_404(
+        ServiceProvider.objects.only(*PUBLIC_PROVIDER_FIELDS).prefetch_related(Prefetch(
+            'categories',
+            queryset=ServiceProviderCategory.objects.only('id', 'provider_id', 'category_name', 'description', 'rent_value', 'other_charges'),
+        )),
+        pk=pk,
+    ))
     return render(request, 'provider_detail.html', {'provider': provider})
 
 def hire_provider(request: HttpRequest, pk: int) -> HttpResponse:
     if request.session.get('role') != 'user':
         messages.error(request, 'Please login as a user to hire.')
         return redirect('login')
+    user = get_app_user(request)
+    if user is None:
+        return redirect('login')
     provider = get_object_or_404(ServiceProvider, pk=pk)
-    user = AppUser.objects.get(id=request.session['user_id'])
     service_name = request.POST.get('service_name')
+    categories = provider.categories.only('category_id', 'category_name')
+    matched = categories.filter(category_name=service_name).first() if service_name else categories.first()
     if not service_name:
-        first_category = provider.categories.first()
-        service_name = first_category.category_name if first_category else 'Service'
-    Booking.objects.create(
+        service_name = matched.category_name if matched else 'Service'
+    booking_states.hire(
+        user,
         booking_reference_id=generate_booking_ref(),
-        user=user,
         service_provider=provider,
         service_name=service_name,
-        status='assigned'
+        category_id=matched.category_id if matched else None,
     )
     messages.success(request, 'Hire request created successfully.')
     return redirect('user_dashboard')
@@ -208,12 +286,13 @@ def booking_cancel(request: HttpRequest, pk: int) -> HttpResponse:
     if request.session.get('role') != 'user':
         messages.error(request, 'Please login to manage bookings.')
         return redirect('login')
-    booking = get_object_or_404(Booking, pk=pk, user_id=request.session['user_id'])
-    if booking.status in ['completed', 'cancelled']:
+    user = get_app_user(request)
+    if user is None:
+        return redirect('login')
+    if not booking_states.transition(Booking.objects.filter(pk=pk, user=user), 'cancel', actor=user.email, app_user_id=user.pk):
+        get_object_or_404(Booking.objects.only('pk'), pk=pk, user=user)
         messages.info(request, 'Booking already finalized.')
         return redirect('user_dashboard')
-    booking.status = 'cancelled'
-    booking.save()
     messages.success(request, 'Booking cancelled.')
     return redirect('user_dashboard')
 
@@ -221,11 +300,19 @@ def booking_complete(request: HttpRequest, pk: int) -> HttpResponse:
     if request.session.get('role') != 'user':
         messages.error(request, 'Please login to manage bookings.')
         return redirect('login')
-    booking = get_object_or_404(Booking, pk=pk, user_id=request.session['user_id'])
-    if booking.status in ['completed', 'cancelled']:
+    user = get_app_user(request)
+    if user is None:
+        return redirect('login')
+    if not booking_states.transition(Booking.objects.filter(pk=pk, user=user), 'complete', actor=user.email, app_user_id=user.pk):
+        get_object_or_404(Booking.objects.only('pk'), pk=pk, user=user)
         messages.info(request, 'Booking already finalized.')
         return redirect('user_dashboard')
-    booking.status = 'completed'
-    booking.save()
     messages.success(request, 'Marked booking as completed.')
     return redirect('user_dashboard')
+
+def metrics(request: HttpRequest) -> HttpResponse:
+    # Prometheus scrapes with "Authorization: Bearer <METRICS_TOKEN>"; without a token the endpoint does not exist
+    token = settings.METRICS_TOKEN
+    if not token or not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        raise Http404
+    return HttpResponse(instrumentation.render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,8 @@
+# Gunicorn picks this file up from the working directory (shsite/), so it applies to the Render start command as-is.
+# Every module-level name is read as a gunicorn setting, hence the module import.
+import decouple
+
+workers = decouple.config('WEB_CONCURRENCY', default=2, cast=int)
+# Threads let one worker overlap database round trips; the uvicorn worker class ignores this
+threads = decouple.config('GUNICORN_THREADS', default=4, cast=int)
+worker_class = decouple.config('GUNICORN_WORKER_CLASS', default='gthread')
@@ -46,10 +46,13 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'core.middleware.InstrumentationMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.AppUserMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -58,7 +61,8 @@ ROOT_URLCONF = 'shsite.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to InstrumentationMiddleware
+        'BACKEND': 'core.backends.templates.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -78,18 +82,95 @@ WSGI_APPLICATION = 'shsite.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Seconds a connection is kept open between requests; health checks replace connections the server dropped
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=600, cast=int)
+# PostgreSQL aborts any statement running longer than this many milliseconds (0 disables; the
+# Render build runs migrate with 0 so a long ALTER or index build is not cut off)
+DB_STATEMENT_TIMEOUT_MS = config('DB_STATEMENT_TIMEOUT_MS', default=30000, cast=int)
+# Seconds a SQLite connection waits for another writer's lock before raising "database is locked"
+SQLITE_BUSY_TIMEOUT = config('SQLITE_BUSY_TIMEOUT', default=20, cast=int)
+# IMMEDIATE makes every transaction queue for the write lock on BEGIN instead of failing when it upgrades from a read
+SQLITE_TRANSACTION_MODE = config('SQLITE_TRANSACTION_MODE', default='IMMEDIATE')
+# Run on every new SQLite connection; WAL lets readers run while one connection writes
+SQLITE_PRAGMAS = {
+    'journal_mode': config('SQLITE_JOURNAL_MODE', default='wal'),
+    'synchronous': config('SQLITE_SYNCHRONOUS', default='normal'),
+    'mmap_size': config('SQLITE_MMAP_SIZE', default=128 * 1024 * 1024, cast=int),
+}
+
 if config('DATABASE_URL', default=None):
     DATABASES = {
-        'default': dj_database_url.config(default=config('DATABASE_URL'), conn_max_age=600)
+        'default': dj_database_url.config(default=config('DATABASE_URL'), conn_max_age=DB_CONN_MAX_AGE, conn_health_checks=True)
     }
 else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            # on disk, so tests get WAL, busy_timeout and BEGIN IMMEDIATE like the real file; threads sharing an
+            # in-memory test database fail with "database table is locked" instead of waiting
+            'TEST': {'NAME': BASE_DIR / 'test_db.sqlite3'},
         }
     }
 
+# Read replicas (comma-separated database URLs). core.routers.ReplicaRouter sends reads from safe requests to them
+REPLICA_DATABASE_URLS = config('REPLICA_DATABASE_URLS', default='', cast=Csv())
+for index, url in enumerate(REPLICA_DATABASE_URLS):
+    DATABASES[f'replica{index}'] = dj_database_url.parse(url, conn_max_age=DB_CONN_MAX_AGE, conn_health_checks=True, test_options={'MIRROR': 'default'})
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+# Seconds a client reads from the primary after a write, so replication lag never hides its own changes
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=15, cast=int)
+# Seconds an unreachable replica is skipped before it is tried again
+REPLICA_RETRY_SECONDS = config('REPLICA_RETRY_SECONDS', default=30, cast=int)
+
+for database in DATABASES.values():
+    if database['ENGINE'] == 'django.db.backends.postgresql' and DB_STATEMENT_TIMEOUT_MS:
+        # added to whatever options the URL set (a search_path, say) rather than replacing them
+        options = database.setdefault('OPTIONS', {})
+        options['options'] = f"{options.get('options', '')} -c statement_timeout={DB_STATEMENT_TIMEOUT_MS}".strip()
+    elif database['ENGINE'] == 'django.db.backends.sqlite3':
+        database['ENGINE'] = 'core.backends.sqlite3'
+        database.setdefault('OPTIONS', {}).update({
+            'timeout': SQLITE_BUSY_TIMEOUT,
+            'transaction_mode': SQLITE_TRANSACTION_MODE,
+            'init_command': ';'.join(f'PRAGMA {pragma} = {value}' for pragma, value in SQLITE_PRAGMAS.items()),
+        })
+
+
+# Cache
+# CACHE_BACKEND is one of locmem (default, per process), file or redis (needs the redis package)
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND],
+        'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / '.cache') if CACHE_BACKEND == 'file' else ''),
+    }
+}
+
+# Seconds public page data (home aggregates, provider cards) stays cached; saves/deletes invalidate it sooner
+PUBLIC_CACHE_TIMEOUT = config('PUBLIC_CACHE_TIMEOUT', default=300, cast=int)
+
+
+# Sessions
+# SESSION_BACKEND is one of db (default), cached_db, cache or signed_cookies. The session only holds
+# user_id and role, so signed_cookies needs no storage at all; cache and cached_db need a shared
+# CACHE_BACKEND (file or redis) when more than one worker process serves requests.
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_BACKEND = config('SESSION_BACKEND', default='db')
+SESSION_ENGINE = SESSION_ENGINES[SESSION_BACKEND]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -110,6 +191,42 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# The first hasher hashes new passwords; older hashes are upgraded on the next successful login.
+# Argon2 needs the argon2-cffi package; scrypt needs OpenSSL 1.1+.
+
+PASSWORD_HASHERS = config(
+    'PASSWORD_HASHERS',
+    default='django.contrib.auth.hashers.PBKDF2PasswordHasher,'
+            'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher,'
+            'django.contrib.auth.hashers.Argon2PasswordHasher,'
+            'django.contrib.auth.hashers.BCryptSHA256PasswordHasher,'
+            'django.contrib.auth.hashers.ScryptPasswordHasher',
+    cast=Csv(),
+)
+
+
+# Email domains allowed to register, matched exactly (gmail.com does not admit mail.gmail.com). Admins can add more in the
+# AllowedEmailDomain table, which is re-read on edit or at least every EMAIL_POLICY_TTL seconds.
+ALLOWED_EMAIL_DOMAINS = config(
+    'ALLOWED_EMAIL_DOMAINS',
+    default='edu,edu.in,ac.in,gov.in,nic.in,companyname.com,companyname.in,startupname.io,organization.org,'
+            'college.edu,college.ac.in,rediffmail.com,yandex.com,gmail.com,yahoo.com,yahoo.co.in,outlook.com,'
+            'hotmail.com,live.com,icloud.com,aol.com,protonmail.com,zoho.com',
+    cast=Csv(),
+)
+EMAIL_POLICY_TTL = config('EMAIL_POLICY_TTL', default=60, cast=int)
+
+# Rate limits for login and password-reset POSTs, per client IP and per submitted email ("count/period")
+RATELIMIT_ENABLED = config('RATELIMIT_ENABLED', default=True, cast=bool)
+RATELIMIT_LOGIN = config('RATELIMIT_LOGIN', default='10/m')
+RATELIMIT_PASSWORD_RESET = config('RATELIMIT_PASSWORD_RESET', default='5/15m')
+# Reverse proxies in front of the app (1 on Render) so the client IP is read from X-Forwarded-For
+RATELIMIT_PROXY_COUNT = config('RATELIMIT_PROXY_COUNT', default=0, cast=int)
+# Keys kept by the in-process fallback when the cache is unavailable
+RATELIMIT_LOCAL_MAX_KEYS = config('RATELIMIT_LOCAL_MAX_KEYS', default=10000, cast=int)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -137,6 +254,15 @@ EMAIL_PORT = config('EMAIL_PORT', default=587, cast=int)
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+# Seconds an SMTP connect or command may block before it fails (Django's default waits forever)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=10, cast=int)
+
+# Outbound mail queue drained by `manage.py send_queued_mail`
+MAIL_QUEUE_MAX_ATTEMPTS = config('MAIL_QUEUE_MAX_ATTEMPTS', default=5, cast=int)
+MAIL_QUEUE_RETRY_BASE_SECONDS = config('MAIL_QUEUE_RETRY_BASE_SECONDS', default=30, cast=int)
+MAIL_QUEUE_RETRY_MAX_SECONDS = config('MAIL_QUEUE_RETRY_MAX_SECONDS', default=3600, cast=int)
+# purge_outbound_email deletes sent and failed rows created more than this many days ago
+MAIL_QUEUE_RETENTION_DAYS = config('MAIL_QUEUE_RETENTION_DAYS', default=7, cast=int)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -156,3 +282,70 @@ else:
     SECURE_SSL_REDIRECT = False
     SESSION_COOKIE_SECURE = False
     CSRF_COOKIE_SECURE = False
+
+# Booking reference numbers reserved per worker process in one counter UPDATE
+BOOKING_REF_BLOCK_SIZE = config('BOOKING_REF_BLOCK_SIZE', default=20, cast=int)
+
+# Bookings moved per UPDATE by a bulk status transition (admin actions)
+BOOKING_TRANSITION_CHUNK_SIZE = config('BOOKING_TRANSITION_CHUNK_SIZE', default=1000, cast=int)
+
+# Bookings shown per page on the user dashboard
+DASHBOARD_PAGE_SIZE = config('DASHBOARD_PAGE_SIZE', default=20, cast=int)
+
+# Providers shown per page on browse_services
+BROWSE_PAGE_SIZE = config('BROWSE_PAGE_SIZE', default=24, cast=int)
+# A browse_services category filter with at most this many providers (per ServiceCategoryStats) reads them off
+# the category index and sorts them; bigger categories are filtered while walking the provider name index
+BROWSE_SMALL_CATEGORY_MAX = config('BROWSE_SMALL_CATEGORY_MAX', default=2000, cast=int)
+
+# Admin changelists on large tables count at most this many rows, and show the table estimate when unfiltered
+ADMIN_EXACT_COUNT_LIMIT = config('ADMIN_EXACT_COUNT_LIMIT', default=10000, cast=int)
+
+# Audit entries are written in one bulk insert per AUDIT_BUFFER_SIZE entries, at most AUDIT_FLUSH_SECONDS after
+# the first one is queued, and when the process exits
+AUDIT_BUFFER_SIZE = config('AUDIT_BUFFER_SIZE', default=100, cast=int)
+AUDIT_FLUSH_SECONDS = config('AUDIT_FLUSH_SECONDS', default=5.0, cast=float)
+# archive_audit_log moves older entries out of the AuditLog table
+AUDIT_LOG_RETENTION_DAYS = config('AUDIT_LOG_RETENTION_DAYS', default=90, cast=int)
+
+# Rows fetched per query by booking exports (admin actions and export_bookings)
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+# PDF exports stop after this many rows (about 1,000 pages); CSV and Excel have no limit
+EXPORT_PDF_MAX_ROWS = config('EXPORT_PDF_MAX_ROWS', default=50000, cast=int)
+
+# Maximum number of hits returned by the service search page
+SEARCH_RESULTS_LIMIT = config('SEARCH_RESULTS_LIMIT', default=50, cast=int)
+# Matches ranked per search: a broad query ranks the first this many it matched rather than the whole index
+SEARCH_RANK_CANDIDATES = config('SEARCH_RANK_CANDIDATES', default=1000, cast=int)
+
+# Seconds to cache the sidebar user's name/role (0 loads the AppUser row when a template reads it)
+APP_USER_CACHE_TTL = config('APP_USER_CACHE_TTL', default=0, cast=int)
+
+# Request instrumentation (core.middleware.InstrumentationMiddleware)
+# Requests and queries slower than these are logged at WARNING, queries with their SQL
+SLOW_REQUEST_MS = config('SLOW_REQUEST_MS', default=1000, cast=int)
+SLOW_QUERY_MS = config('SLOW_QUERY_MS', default=500, cast=int)
+# A request that runs the same SQL statement this many times is logged and counted as an N+1
+N_PLUS_ONE_THRESHOLD = config('N_PLUS_ONE_THRESHOLD', default=10, cast=int)
+# Send db, tpl and view timings to the browser in a Server-Timing header
+SERVER_TIMING = config('SERVER_TIMING', default=True, cast=bool)
+# /metrics answers only "Authorization: Bearer <METRICS_TOKEN>" and is disabled while the token is empty. Each worker
+# copies its totals into the cache this often, so every worker can report them all; like the session backends this
+# needs a shared CACHE_BACKEND (file or redis) when more than one worker process serves requests
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_PUBLISH_SECONDS = config('METRICS_PUBLISH_SECONDS', default=15, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'plain': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+    },
+    'loggers': {
+        # DEBUG adds one line per request from core.instrumentation; slow requests and queries and N+1s are WARNINGs
+        'core': {'handlers': ['console'], 'level': config('LOG_LEVEL', default='INFO'), 'propagate': False},
+    },
+}